@@ -181,3 +181,13 @@ EVENT_DOCUMENT_CLASSIFICATION_CHOICES = (
 )
 
 EVENT_DOCUMENT_CLASSIFICATIONS = _keys(EVENT_DOCUMENT_CLASSIFICATION_CHOICES)
+
+# how much of a date string was given, see opencivicdata.dates.parse_timestamp
+DATE_PRECISION_CHOICES = (
+    ("year", "Year"),
+    ("month", "Month"),
+    ("day", "Day"),
+    ("minute", "Minute"),
+    ("second", "Second"),
+)
+DATE_PRECISIONS = _keys(DATE_PRECISION_CHOICES)
@@ -7,9 +7,10 @@ from opencivicdata.divisions import Division as FileDivision
 from ...models import Division
 
 
-def to_db(fd):
+def to_db(fd, args=None):
     """ convert a FileDivision to a Division """
-    args, _ = Division.subtypes_from_id(fd.id)
+    if args is None:
+        args, _ = Division.subtypes_from_id(fd.id)
     if fd.sameAs:
         args["redirect_id"] = fd.sameAs
     return Division(id=fd.id, name=fd.name, **args)
@@ -19,10 +20,12 @@ def load_divisions(country, bulk=False):
     existing_divisions = Division.objects.filter(country=country)
 
     country_division = FileDivision.get("ocd-division/country:{}".format(country))
-    objects = [to_db(country_division)]
+    file_divisions = [country_division]
+    file_divisions.extend(country_division.children(levels=100))
 
-    for child in country_division.children(levels=100):
-        objects.append(to_db(child))
+    # parse & validate all ids in one go rather than one at a time
+    parsed = Division.subtypes_from_ids(fd.id for fd in file_divisions)
+    objects = [to_db(fd, args) for fd, (args, _) in zip(file_divisions, parsed)]
 
     print(
         "{} divisions found in the CSV, and {} already in the DB".format(
@@ -0,0 +1,86 @@
+import calendar
+import datetime
+import re
+
+from django.contrib.postgres.operations import BtreeGistExtension
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+try:
+    from django.db.backends.postgresql.psycopg_any import DateRange
+except ImportError:  # Django < 4.2
+    from psycopg2.extras import DateRange
+
+BATCH_SIZE = 5000
+
+# the parsing is inlined so this migration keeps doing what it did when it was written,
+# opencivicdata.dates has the current version
+PARTIAL_DATE_RE = re.compile(r"^(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?")
+
+
+def partial_date_bounds(value):
+    match = PARTIAL_DATE_RE.match(value or "")
+    if not match or not int(match.group(1)):
+        return None, None
+    year, month, day = match.groups()
+    year = int(year)
+    if month and 1 <= int(month) <= 12:
+        month = int(month)
+        last_day = calendar.monthrange(year, month)[1]
+        if day and 1 <= int(day) <= last_day:
+            day = datetime.date(year, month, int(day))
+            return day, day
+        return datetime.date(year, month, 1), datetime.date(year, month, last_day)
+    return datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+
+
+def partial_date_range(start, end):
+    lower = partial_date_bounds(start)[0]
+    upper = partial_date_bounds(end)[1]
+    if lower and upper and upper < lower:
+        return None
+    return lower, upper
+
+
+def populate_date_range(apps, schema_editor):
+    Membership = apps.get_model("core", "Membership")
+    batch = []
+    memberships = Membership.objects.only("id", "start_date", "end_date")
+    for membership in memberships.iterator(chunk_size=BATCH_SIZE):
+        bounds = partial_date_range(membership.start_date, membership.end_date)
+        if bounds is None:
+            membership.date_range = DateRange(empty=True)
+        else:
+            membership.date_range = DateRange(bounds[0], bounds[1], "[]")
+        batch.append(membership)
+        if len(batch) == BATCH_SIZE:
+            Membership.objects.bulk_update(batch, ["date_range"])
+            batch = []
+    Membership.objects.bulk_update(batch, ["date_range"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0006_merge_20200103_1432")]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name="membership",
+            name="date_range",
+            field=django.contrib.postgres.fields.ranges.DateRangeField(
+                editable=False,
+                help_text="The dates covered by start_date and end_date, "
+                "maintained automatically.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(populate_date_range, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="membership",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["organization", "date_range"], name="membership_date_range"
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0007_membership_date_range")]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name="organizationidentifier",
+            index_together={("scheme", "identifier")},
+        ),
+        migrations.AlterIndexTogether(
+            name="personidentifier", index_together={("scheme", "identifier")}
+        ),
+    ]
@@ -0,0 +1,27 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # build the indexes without locking out writes to large tables
+    atomic = False
+
+    dependencies = [("core", "0008_identifier_scheme_index")]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="organization",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="organization_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="person",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="person_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,96 @@
+import django.contrib.postgres.fields.ranges
+from django.db import migrations
+
+# the SQL twins of opencivicdata.dates.partial_date_bounds & partial_date_range, used to
+# keep Membership.date_range in step with start_date & end_date however they are written
+
+PARTIAL_DATE_FUNCTIONS_SQL = r"""
+CREATE OR REPLACE FUNCTION opencivicdata_partial_date_bounds(value text)
+RETURNS daterange AS $$
+DECLARE
+    parts text[] := regexp_match(value, '^(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?');
+    first date;
+    last date;
+BEGIN
+    IF parts IS NULL OR parts[1]::int = 0 THEN
+        RETURN NULL;
+    END IF;
+    first := make_date(parts[1]::int, 1, 1);
+    last := make_date(parts[1]::int, 12, 31);
+    -- out of range months or days fall back to the coarser year or month
+    IF parts[2]::int BETWEEN 1 AND 12 THEN
+        first := make_date(parts[1]::int, parts[2]::int, 1);
+        last := (first + interval '1 month - 1 day')::date;
+        IF parts[3]::int BETWEEN 1 AND extract(day FROM last) THEN
+            first := make_date(parts[1]::int, parts[2]::int, parts[3]::int);
+            last := first;
+        END IF;
+    END IF;
+    RETURN daterange(first, last, '[]');
+END
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION opencivicdata_partial_date_range(start_date text, end_date text)
+RETURNS daterange AS $$
+DECLARE
+    first daterange := opencivicdata_partial_date_bounds(start_date);
+    last daterange := opencivicdata_partial_date_bounds(end_date);
+BEGIN
+    -- blank is unbounded, but unparseable dates are unknown
+    IF (first IS NULL AND COALESCE(start_date, '') <> '')
+            OR (last IS NULL AND COALESCE(end_date, '') <> '')
+            OR lower(first) >= upper(last) THEN
+        RETURN 'empty';
+    END IF;
+    RETURN daterange(lower(first), upper(last));
+END
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION opencivicdata_membership_date_range() RETURNS trigger AS $$
+BEGIN
+    NEW.date_range := opencivicdata_partial_date_range(NEW.start_date, NEW.end_date);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS membership_date_range ON opencivicdata_membership;
+CREATE TRIGGER membership_date_range
+    BEFORE INSERT OR UPDATE OF start_date, end_date, date_range ON opencivicdata_membership
+    FOR EACH ROW EXECUTE PROCEDURE opencivicdata_membership_date_range();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS membership_date_range ON opencivicdata_membership;
+DROP FUNCTION IF EXISTS opencivicdata_membership_date_range();
+DROP FUNCTION IF EXISTS opencivicdata_partial_date_range(text, text);
+DROP FUNCTION IF EXISTS opencivicdata_partial_date_bounds(text);
+"""
+
+# recompute every range, stale or derived from unparseable dates
+REFRESH_SQL = """
+UPDATE opencivicdata_membership SET date_range = date_range
+WHERE date_range IS DISTINCT FROM opencivicdata_partial_date_range(start_date, end_date)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0009_trigram_indexes")]
+
+    operations = [
+        migrations.RunSQL(
+            PARTIAL_DATE_FUNCTIONS_SQL + CREATE_TRIGGER_SQL + REFRESH_SQL, DROP_TRIGGER_SQL
+        ),
+        migrations.AlterField(
+            model_name="membership",
+            name="date_range",
+            field=django.contrib.postgres.fields.ranges.DateRangeField(
+                editable=False,
+                help_text="The dates covered by start_date and end_date, "
+                "maintained by a database trigger.",
+                null=True,
+            ),
+        ),
+    ]
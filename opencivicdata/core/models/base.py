@@ -1,12 +1,75 @@
 from __future__ import unicode_literals
+import datetime
 import re
 import uuid
-from django.db import models
+from django.db import connections, models
 from django.db.models import JSONField
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.lookups import TrigramSimilar, TrigramWordSimilar
+from django.contrib.postgres.search import TrigramSimilarity, TrigramWordSimilarity
 from django.core.validators import RegexValidator
 
 from ... import common
+from ...dates import parse_timestamp
+
+
+# default thresholds for trigram_search, the same as pg_trgm's own defaults for the
+# similarity_threshold and word_similarity_threshold applied by the % and %> operators
+TRIGRAM_SIMILARITY_THRESHOLD = 0.3
+TRIGRAM_WORD_SIMILARITY_THRESHOLD = 0.6
+
+
+def _trigram_setting(using, name, default):
+    """ the threshold the % or %> operator applies on the ``using`` connection """
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT current_setting(%s, true)", [name])
+        value = cursor.fetchone()[0]
+    # unset until pg_trgm is loaded into the session, when its defaults apply
+    return float(value) if value else default
+
+
+def trigram_search(queryset, field, value, threshold=None, word=False):
+    """
+    Rows of ``queryset`` whose ``field`` is similar to ``value``, most similar first.
+
+    Results are annotated with their ``similarity``.  With ``word`` set, ``value`` is
+    compared to the best matching stretch of words in ``field`` rather than all of it,
+    which suits searching long text such as titles.
+
+    Thresholds at or above the database's pg_trgm.similarity_threshold (or
+    word_similarity_threshold) filter with the % (or %>) operator first so that a
+    trigram index on ``field`` is used; lower thresholds scan the table.
+    """
+    if word:
+        default = TRIGRAM_WORD_SIMILARITY_THRESHOLD
+        setting = "pg_trgm.word_similarity_threshold"
+        operator = TrigramWordSimilar(models.F(field), value)
+        similarity = TrigramWordSimilarity(value, field)
+    else:
+        default = TRIGRAM_SIMILARITY_THRESHOLD
+        setting = "pg_trgm.similarity_threshold"
+        operator = TrigramSimilar(models.F(field), value)
+        similarity = TrigramSimilarity(field, value)
+    if threshold is None:
+        threshold = default
+
+    queryset = queryset.annotate(similarity=similarity)
+    if threshold >= _trigram_setting(queryset.db, setting, default):
+        queryset = queryset.filter(operator)
+    return queryset.filter(similarity__gte=threshold).order_by("-similarity")
+
+
+def array_match(field, values, match_all=False):
+    """
+    A Q object for rows whose array ``field`` holds any of ``values`` (a string or list).
+
+    With ``match_all`` every value must be present.  The lookups compile to the && and @>
+    operators, which a GIN index on ``field`` can answer.
+    """
+    if isinstance(values, str):
+        values = [values]
+    lookup = "contains" if match_all else "overlap"
+    return models.Q(**{"{}__{}".format(field, lookup): list(values)})
 
 
 class OCDIDField(models.CharField):
@@ -105,11 +168,129 @@ class IdentifierBase(RelatedBase):
 
     class Meta:
         abstract = True
+        index_together = [["scheme", "identifier"]]
 
     def __str__(self):
         return self.identifier
 
 
+class IdentifierQuerySet(models.QuerySet):
+    """
+    QuerySet for models that are the target of an IdentifierBase model.
+    """
+
+    # related_name used by the IdentifierBase model's ForeignKey to this model
+    identifier_relation = "identifiers"
+
+    def by_identifiers(self, scheme, identifiers, chunk_size=5000):
+        """
+        Look up objects by many upstream identifiers from a single scheme.
+
+        Returns a dict mapping each identifier that was found to its object, identifiers
+        that aren't found are left out.  Identifiers are resolved ``chunk_size`` at a time
+        and the objects are then fetched with ``in_bulk``, so even tens of thousands of
+        identifiers take only a handful of queries.  Should an identifier be attached to
+        more than one object, one of them is picked arbitrarily.
+        """
+        relation = self.model._meta.get_field(self.identifier_relation)
+        identifier_model = relation.related_model
+        owner_field = relation.field.attname
+
+        identifiers = list(set(identifiers))
+        owner_ids = {}
+        for start in range(0, len(identifiers), chunk_size):
+            chunk = identifiers[start:start + chunk_size]
+            rows = identifier_model.objects.filter(
+                scheme=scheme, identifier__in=chunk
+            ).values_list("identifier", owner_field)
+            for identifier, owner_id in rows:
+                owner_ids.setdefault(identifier, owner_id)
+
+        objects = self.in_bulk(set(owner_ids.values()))
+        return {
+            identifier: objects[owner_id]
+            for identifier, owner_id in owner_ids.items()
+            if owner_id in objects
+        }
+
+
+def timestamp_bound(value, tz=datetime.timezone.utc):
+    """
+    A date, datetime or date string as an aware datetime to compare timestamps with.
+
+    Dates and naive datetimes are taken to be in ``tz``, date strings without an offset
+    are always UTC, as they are when parsed into timestamps.
+    """
+    if value is None or isinstance(value, datetime.datetime):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=tz)
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time(), tz)
+    timestamp, _ = parse_timestamp(value)
+    if timestamp is None:
+        raise ValueError("invalid date: {!r}".format(value))
+    return timestamp
+
+
+class ParsedDateMixin(object):
+    """
+    Maintains <prefix>_timestamp & <prefix>_precision columns for YYYY-MM-DD string fields.
+
+    ``parsed_dates`` lists (string field, prefix) pairs, the columns are filled in with
+    parse_timestamp whenever the object is saved or created with ParsedDateQuerySet.
+    """
+
+    parsed_dates = ()
+
+    def update_parsed_dates(self):
+        for field, prefix in self.parsed_dates:
+            timestamp, precision = parse_timestamp(getattr(self, field))
+            setattr(self, prefix + "_timestamp", timestamp)
+            setattr(self, prefix + "_precision", precision)
+
+    def save(self, *args, **kwargs):
+        self.update_parsed_dates()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = list(update_fields) + [
+                prefix + suffix
+                for field, prefix in self.parsed_dates
+                if field in update_fields
+                for suffix in ("_timestamp", "_precision")
+            ]
+        super(ParsedDateMixin, self).save(*args, **kwargs)
+
+
+class ParsedDateQuerySet(models.QuerySet):
+    """
+    QuerySet for ParsedDateMixin models, with range queries on the parsed timestamps.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.update_parsed_dates()
+        return super(ParsedDateQuerySet, self).bulk_create(objs, *args, **kwargs)
+
+    def between(self, start=None, end=None, field=None):
+        """
+        Objects whose ``field`` (by default the first parsed date) falls on or after
+        ``start`` and before ``end``.
+
+        Bounds may be dates, datetimes (naive ones are taken as UTC) or date strings,
+        either can be None to leave that side open.  Dates with only a year or month
+        are compared by their first day.
+        """
+        prefix = dict(self.model.parsed_dates)[field or self.model.parsed_dates[0][0]]
+        filters = {}
+        if start is not None:
+            filters[prefix + "_timestamp__gte"] = timestamp_bound(start)
+        if end is not None:
+            filters[prefix + "_timestamp__lt"] = timestamp_bound(end)
+        return self.filter(**filters)
+
+
 class RelatedEntityBase(RelatedBase):
     name = models.CharField(max_length=2000)
     entity_type = models.CharField(max_length=20, blank=True)
@@ -1,24 +1,70 @@
+import re
+import sys
+from functools import lru_cache
+
 from django.db import models
 
+from ... import common
+
+DIVISION_ID_RE = re.compile(common.DIVISION_ID_REGEX)
+
+
+@lru_cache(maxsize=None)
+def _subtype_fields(n):
+    """ (subtypeN, subidN) field names for the nth piece of an id """
+    return "subtype{0}".format(n), "subid{0}".format(n)
+
+
+@lru_cache(maxsize=65536)
+def _parse_division_id(division_id):
+    """
+    Split a division id into an immutable tuple of (field, value) pairs.
+
+    Results are memoized as the same ids are parsed over and over again by
+    ``children_of``, ``create`` and ``loaddivisions``.
+    """
+    pieces = [piece.split(":", 1) for piece in division_id.split("/")]
+
+    # if it included the ocd-division bit, pop it off
+    if pieces[0] == ["ocd-division"]:
+        pieces.pop(0)
+
+    if pieces[0][0] != "country":
+        raise ValueError("OCD id must start with country")
+
+    fields = [("country", pieces[0][1])]
+
+    # add the remaining pieces
+    n = 1
+    for stype, subid in pieces[1:]:
+        subtype_field, subid_field = _subtype_fields(n)
+        # subtypes repeat across nearly every id in a country, share one copy
+        fields.append((subtype_field, sys.intern(stype)))
+        fields.append((subid_field, subid))
+        n += 1
+
+    return tuple(fields), n
+
 
 class DivisionManager(models.Manager):
     def children_of(self, division_id, subtype=None, depth=1):
         query, n = Division.subtypes_from_id(division_id)
+        subtype_field, subid_field = _subtype_fields(n)
         q_objects = []
 
         # only get children
         if subtype:
-            query["subtype{0}".format(n)] = subtype
+            query[subtype_field] = subtype
         else:
-            q_objects.append(~models.Q(**{"subtype{0}".format(n): ""}))
-        q_objects.append(~models.Q(**{"subid{0}".format(n): ""}))
+            q_objects.append(~models.Q(**{subtype_field: ""}))
+        q_objects.append(~models.Q(**{subid_field: ""}))
 
         # allow for depth wildcards
-        n += depth
+        subtype_field, subid_field = _subtype_fields(n + depth)
 
         # ensure final field is null
-        q_objects.append(models.Q(**{"subtype{0}".format(n): ""}))
-        q_objects.append(models.Q(**{"subid{0}".format(n): ""}))
+        q_objects.append(models.Q(**{subtype_field: ""}))
+        q_objects.append(models.Q(**{subid_field: ""}))
 
         return self.filter(*q_objects, **query)
 
@@ -132,23 +178,29 @@ class Division(models.Model):
 
     @staticmethod
     def subtypes_from_id(division_id):
-        pieces = [piece.split(":", 1) for piece in division_id.split("/")]
-        fields = {}
+        fields, n = _parse_division_id(division_id)
+        # callers add their own keys, so hand back a fresh dict every time
+        return dict(fields), n
 
-        # if it included the ocd-division bit, pop it off
-        if pieces[0] == ["ocd-division"]:
-            pieces.pop(0)
-
-        if pieces[0][0] != "country":
-            raise ValueError("OCD id must start with country")
-
-        fields["country"] = pieces[0][1]
-
-        # add the remaining pieces
-        n = 1
-        for stype, subid in pieces[1:]:
-            fields["subtype{0}".format(n)] = stype
-            fields["subid{0}".format(n)] = subid
-            n += 1
-
-        return fields, n
+    @staticmethod
+    def subtypes_from_ids(division_ids, validate=True):
+        """
+        Parse many division ids at once.
+
+        Returns a list of ``(fields, n)`` tuples in the same order as
+        ``division_ids``.  If ``validate`` is set every id is first checked
+        against ``common.DIVISION_ID_REGEX`` and a single ValueError listing
+        all of the invalid ids is raised.
+        """
+        division_ids = list(division_ids)
+
+        if validate:
+            invalid = [d for d in division_ids if not DIVISION_ID_RE.match(d)]
+            if invalid:
+                raise ValueError(
+                    "{} invalid OCD division ids: {}".format(
+                        len(invalid), ", ".join(invalid[:10])
+                    )
+                )
+
+        return [(dict(fields), n) for fields, n in map(_parse_division_id, division_ids)]
@@ -1,10 +1,27 @@
 import datetime
 from django.db import models
-from django.db.models import Q, QuerySet
-from .base import OCDBase, LinkBase, OCDIDField, RelatedBase, IdentifierBase
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.contrib.postgres.fields import ArrayField, DateRangeField
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from .base import (
+    OCDBase,
+    LinkBase,
+    OCDIDField,
+    RelatedBase,
+    IdentifierBase,
+    IdentifierQuerySet,
+    trigram_search,
+)
 from .division import Division
 from .jurisdiction import Jurisdiction
 from ... import common
+from ...dates import partial_date_bounds
+
+try:
+    from django.db.backends.postgresql.psycopg_any import DateRange
+except ImportError:  # Django < 4.2
+    from psycopg2.extras import DateRange
 
 # abstract models
 
@@ -72,6 +89,90 @@ class OtherNameBase(RelatedBase):
         return "{} ({})".format(self.name, self.note)
 
 
+# guard against runaway recursion if parent links ever form a cycle
+MAX_ORGANIZATION_DEPTH = 50
+
+# walk the parent links from a single organization, the {join} determines the direction
+ORGANIZATION_TREE_SQL = """
+WITH RECURSIVE tree (id, parent_id, depth) AS (
+    SELECT id, parent_id, 0 FROM opencivicdata_organization WHERE id = %s
+  UNION ALL
+    SELECT o.id, o.parent_id, tree.depth + 1
+    FROM opencivicdata_organization o JOIN tree ON {join}
+    WHERE tree.depth < %s
+)
+SELECT jsonb_object_agg(id, depth) FROM tree WHERE depth > 0
+"""
+
+# correlated chain of parents for each row of the outer query, nearest parent first
+ORGANIZATION_ANCESTRY_SQL = """
+WITH RECURSIVE chain (id, parent_id, name, depth) AS (
+    SELECT p.id, p.parent_id, p.name, 1 FROM opencivicdata_organization p
+    WHERE p.id = opencivicdata_organization.parent_id
+  UNION ALL
+    SELECT p.id, p.parent_id, p.name, chain.depth + 1
+    FROM opencivicdata_organization p JOIN chain ON p.id = chain.parent_id
+    WHERE chain.depth < %s
+)
+SELECT COALESCE(array_agg(chain.{column} ORDER BY chain.depth), '{{}}') FROM chain
+"""
+
+
+class OrganizationQuerySet(IdentifierQuerySet):
+    def _tree(self, organization, join, max_depth):
+        # the tree is computed once per query as a {id: depth} mapping, which is then
+        # used both to restrict the rows (by primary key) and to annotate the depth
+        tree = "({})".format(ORGANIZATION_TREE_SQL.format(join=join))
+        params = (getattr(organization, "pk", organization), max_depth)
+        return (
+            self.filter(id__in=RawSQL("SELECT jsonb_object_keys({})".format(tree), params))
+            .annotate(
+                depth=RawSQL(
+                    "({} ->> opencivicdata_organization.id)::integer".format(tree),
+                    params,
+                    output_field=models.IntegerField(),
+                )
+            )
+            .order_by("depth", "name")
+        )
+
+    def ancestors(self, organization, max_depth=MAX_ORGANIZATION_DEPTH):
+        """
+        All parents of an organization (or organization id) in a single query,
+        ordered from the immediate parent upwards and annotated with their depth.
+        """
+        return self._tree(organization, "o.id = tree.parent_id", max_depth)
+
+    def descendants(self, organization, max_depth=MAX_ORGANIZATION_DEPTH):
+        """
+        All children of an organization (or organization id) in a single query,
+        ordered level by level and annotated with their depth.
+        """
+        return self._tree(organization, "o.parent_id = tree.id", max_depth)
+
+    def similar_to(self, name, threshold=None):
+        """ organizations with names similar to ``name``, ranked by trigram similarity """
+        return trigram_search(self, "name", name, threshold)
+
+    def with_ancestry(self, max_depth=MAX_ORGANIZATION_DEPTH):
+        """
+        Annotate each organization with ancestor_ids and ancestor_names, both ordered
+        from the immediate parent upwards, so the chain can be shown without extra queries.
+        """
+        return self.annotate(
+            ancestor_ids=RawSQL(
+                ORGANIZATION_ANCESTRY_SQL.format(column="id"),
+                (max_depth,),
+                output_field=ArrayField(models.TextField()),
+            ),
+            ancestor_names=RawSQL(
+                ORGANIZATION_ANCESTRY_SQL.format(column="name"),
+                (max_depth,),
+                output_field=ArrayField(models.TextField()),
+            ),
+        )
+
+
 # the actual models
 
 
@@ -80,6 +181,8 @@ class Organization(OCDBase):
     A group of people, typically in a legislative or rule-making context.
     """
 
+    objects = OrganizationQuerySet.as_manager()
+
     id = OCDIDField(ocd_type="organization")
     name = models.CharField(max_length=300, help_text="The name of the Organization.")
     image = models.URLField(
@@ -125,24 +228,13 @@ class Organization(OCDBase):
 
     # Access all "ancestor" organizations
     def get_parents(self):
-        org = self
-        while True:
-            org = org.parent
-            # Django accesses parents lazily, so have to check if one actually exists
-            if org:
-                yield org
-            else:
-                break
+        # fetched in one query instead of lazily following each parent link
+        for org in Organization.objects.ancestors(self):
+            yield org
 
     def get_current_members(self):
         """ return all Person objects w/ current memberships to org """
-        today = datetime.date.today().isoformat()
-
-        return Person.objects.filter(
-            Q(memberships__start_date="") | Q(memberships__start_date__lte=today),
-            Q(memberships__end_date="") | Q(memberships__end_date__gte=today),
-            memberships__organization_id=self.id,
-        )
+        return Person.objects.member_of(self)
 
     class Meta:
         db_table = "opencivicdata_organization"
@@ -150,6 +242,11 @@ class Organization(OCDBase):
             ["jurisdiction", "classification", "name"],
             ["classification", "name"],
         ]
+        indexes = [
+            GinIndex(
+                name="organization_name_trgm", fields=["name"], opclasses=["gin_trgm_ops"]
+            )
+        ]
 
 
 class OrganizationIdentifier(IdentifierBase):
@@ -168,7 +265,7 @@ class OrganizationIdentifier(IdentifierBase):
         tmpl = "%s identifies %s"
         return tmpl % (self.identifier, self.organization)
 
-    class Meta:
+    class Meta(IdentifierBase.Meta):
         db_table = "opencivicdata_organizationidentifier"
 
 
@@ -318,29 +415,48 @@ class PostLink(LinkBase):
         db_table = "opencivicdata_postlink"
 
 
-class PersonQuerySet(QuerySet):
-    def member_of(self, organization_name, current_only=True, post=None):
-        filter_params = []
+class PersonQuerySet(IdentifierQuerySet):
+    def member_of(self, organization, current_only=True, post=None, as_of=None):
+        """
+        People with a membership in an organization.
+
+        ``organization`` may be an Organization, an organization id or name, or a list
+        of any of those.  Memberships must be in effect on ``as_of`` if given, otherwise
+        today if ``current_only`` is set.  Each person is returned once regardless of how
+        many of their memberships match.
+        """
+        if isinstance(organization, (str, Organization)):
+            organization = [organization]
+
+        ids, names = [], []
+        for org in organization:
+            if isinstance(org, Organization):
+                ids.append(org.id)
+            elif org.startswith("ocd-organization/"):
+                ids.append(org)
+            else:
+                names.append(org)
+
+        if not ids and not names:
+            return self.none()
 
-        if current_only:
-            today = datetime.date.today().isoformat()
+        org_filter = Q()
+        if ids:
+            org_filter |= Q(organization_id__in=ids)
+        if names:
+            org_filter |= Q(organization__name__in=names)
 
-            filter_params = [
-                Q(memberships__start_date="") | Q(memberships__start_date__lte=today),
-                Q(memberships__end_date="") | Q(memberships__end_date__gte=today),
-            ]
+        memberships = Membership.objects.filter(org_filter, person_id=OuterRef("pk"))
+        if as_of is not None or current_only:
+            memberships = memberships.active_on(as_of)
         if post:
-            filter_params.append(Q(memberships__post__label=post))
+            memberships = memberships.filter(post__label=post)
 
-        if organization_name.startswith("ocd-organization/"):
-            qs = self.filter(
-                *filter_params, memberships__organization_id=organization_name
-            )
-        else:
-            qs = self.filter(
-                *filter_params, memberships__organization__name=organization_name
-            )
-        return qs
+        return self.filter(Exists(memberships))
+
+    def similar_to(self, name, threshold=None):
+        """ people with names similar to ``name``, ranked by trigram similarity """
+        return trigram_search(self, "name", name, threshold)
 
 
 class Person(OCDBase):
@@ -403,6 +519,9 @@ class Person(OCDBase):
     class Meta:
         db_table = "opencivicdata_person"
         verbose_name_plural = "people"
+        indexes = [
+            GinIndex(name="person_name_trgm", fields=["name"], opclasses=["gin_trgm_ops"])
+        ]
 
 
 class PersonIdentifier(IdentifierBase):
@@ -417,7 +536,7 @@ class PersonIdentifier(IdentifierBase):
         help_text="A link to the Person connected to this alternative identifier.",
     )
 
-    class Meta:
+    class Meta(IdentifierBase.Meta):
         db_table = "opencivicdata_personidentifier"
 
 
@@ -485,11 +604,33 @@ class PersonSource(LinkBase):
         db_table = "opencivicdata_personsource"
 
 
+class MembershipQuerySet(QuerySet):
+    def active_on(self, date=None):
+        """
+        Memberships in effect on a given date (defaults to today).
+
+        ``date`` may also be a YYYY[-MM[-DD]] string, a year or month matches memberships
+        in effect at any point during it.
+        """
+        if isinstance(date, str):
+            first, last = partial_date_bounds(date)
+            if first is None:
+                raise ValueError("invalid date: {!r}".format(date))
+            if first != last:
+                return self.filter(date_range__overlap=DateRange(first, last, "[]"))
+            date = first
+        elif isinstance(date, datetime.datetime):
+            date = date.date()
+        return self.filter(date_range__contains=date or datetime.date.today())
+
+
 class Membership(OCDBase):
     """
     A relationship between a Person and an Organization, possibly including a Post.
     """
 
+    objects = MembershipQuerySet.as_manager()
+
     id = OCDIDField(ocd_type="membership")
     organization = models.ForeignKey(
         Organization,
@@ -546,10 +687,21 @@ class Membership(OCDBase):
         blank=True,
         help_text="The date on which the relationship ended in YYYY[-MM[-DD]] string format.",
     )
+    # set by the database on every write of start_date/end_date, including update() and
+    # bulk_update(), so it is only current on instances read back from the database
+    date_range = DateRangeField(
+        null=True,
+        editable=False,
+        help_text="The dates covered by start_date and end_date, maintained by a database "
+        "trigger.",
+    )
 
     class Meta:
         db_table = "opencivicdata_membership"
         index_together = [["organization", "person", "label", "post"]]
+        indexes = [
+            GistIndex(fields=["organization", "date_range"], name="membership_date_range")
+        ]
 
     def __str__(self):
         return "{} in {} ({})".format(self.person, self.organization, self.role)
@@ -0,0 +1,119 @@
+"""
+Resolution of raw names against the Person & Organization tables and their other names.
+"""
+from collections import defaultdict
+
+from ..names import NameIndex, normalize_name, normalize_organization_name
+from .models import Membership, Organization, OrganizationName, Person, PersonName
+
+
+class PersonNameResolver(object):
+    """
+    Resolves batches of raw names to Person ids.
+
+    Each scope (jurisdiction, organization and/or date) is loaded into an in-memory
+    NameIndex once, with two queries, and reused for every later name in that scope.
+    People are in scope if they had a membership in the organization, or any
+    organization of the jurisdiction, in effect on the date.
+
+        resolver = PersonNameResolver()
+        matches = resolver.resolve(["Sen. Smith", "Jones, Tom"], organization=senate,
+                                   date="2017-02-16")
+        matches["Jones, Tom"].id        # a person id, or None
+        matches["Sen. Smith"].ids       # every candidate, see .ambiguous
+    """
+
+    def __init__(self, normalizer=normalize_name):
+        self.normalizer = normalizer
+        self._indexes = {}
+
+    def people(self, jurisdiction=None, organization=None, date=None):
+        """ a queryset of the ids of people in scope """
+        if not (jurisdiction or organization or date):
+            return Person.objects.values("id")
+
+        memberships = Membership.objects.filter(person__isnull=False)
+        if jurisdiction:
+            memberships = memberships.filter(
+                organization__jurisdiction_id=getattr(jurisdiction, "pk", jurisdiction)
+            )
+        if organization:
+            memberships = memberships.filter(
+                organization_id=getattr(organization, "pk", organization)
+            )
+        if date:
+            memberships = memberships.active_on(date)
+        return memberships.values("person_id")
+
+    def index(self, jurisdiction=None, organization=None, date=None):
+        """ the NameIndex for a scope, built on first use """
+        key = (
+            getattr(jurisdiction, "pk", jurisdiction),
+            getattr(organization, "pk", organization),
+            str(date) if date else None,
+        )
+        if key not in self._indexes:
+            self._indexes[key] = self.build_index(*key)
+        return self._indexes[key]
+
+    def build_index(self, jurisdiction=None, organization=None, date=None):
+        person_ids = self.people(jurisdiction, organization, date)
+
+        other_names = defaultdict(list)
+        for person_id, name in PersonName.objects.filter(
+            person_id__in=person_ids
+        ).values_list("person_id", "name"):
+            other_names[person_id].append(name)
+
+        index = NameIndex(self.normalizer)
+        for person_id, name, sort_name, given_name, family_name in Person.objects.filter(
+            id__in=person_ids
+        ).values_list("id", "name", "sort_name", "given_name", "family_name"):
+            index.add_person(
+                person_id, name, sort_name, given_name, family_name, other_names[person_id]
+            )
+        return index
+
+    def resolve(self, names, jurisdiction=None, organization=None, date=None):
+        """ match a batch of raw names, returning a dict of raw name to NameMatch """
+        return self.index(jurisdiction, organization, date).match_all(names)
+
+    def resolve_name(self, name, jurisdiction=None, organization=None, date=None):
+        return self.index(jurisdiction, organization, date).match(name)
+
+
+class OrganizationNameResolver(object):
+    """
+    Resolves batches of raw names to Organization ids, one in-memory index per jurisdiction.
+    """
+
+    def __init__(self, normalizer=normalize_organization_name):
+        self.normalizer = normalizer
+        self._indexes = {}
+
+    def index(self, jurisdiction=None):
+        key = getattr(jurisdiction, "pk", jurisdiction)
+        if key not in self._indexes:
+            self._indexes[key] = self.build_index(key)
+        return self._indexes[key]
+
+    def build_index(self, jurisdiction=None):
+        organizations = Organization.objects.all()
+        other_names = OrganizationName.objects.all()
+        if jurisdiction:
+            organizations = organizations.filter(jurisdiction_id=jurisdiction)
+            other_names = other_names.filter(organization__jurisdiction_id=jurisdiction)
+
+        index = NameIndex(self.normalizer)
+        for organization_id, name in organizations.values_list("id", "name"):
+            index.add(organization_id, name)
+        for organization_id, name in other_names.values_list("organization_id", "name"):
+            index.add(organization_id, name)
+        return index
+
+    def resolve(self, names, jurisdiction=None):
+        """ match a batch of raw names, returning a dict of raw name to NameMatch """
+        return self.index(jurisdiction).match_all(names)
+
+    def resolve_name(self, name, jurisdiction=None):
+        return self.index(jurisdiction).match(name)
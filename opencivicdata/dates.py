@@ -0,0 +1,115 @@
+"""
+Helpers for the partial date strings used throughout Open Civic Data.
+
+Most date fields are stored as ``YYYY[-MM[-DD]]`` strings, these helpers convert them
+into real dates with well-defined semantics for the parts that are missing.
+"""
+import calendar
+import datetime
+import re
+
+PARTIAL_DATE_RE = re.compile(r"^(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?")
+TIME_RE = re.compile(
+    r"^[T ](\d{1,2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6})\d*)?)?\s*(Z|[+-]\d{2}(?::?\d{2})?)?$",
+    re.IGNORECASE,
+)
+
+# how much of a date string was given, as stored alongside parsed timestamps
+YEAR, MONTH, DAY, MINUTE, SECOND = "year", "month", "day", "minute", "second"
+
+
+def partial_date_bounds(value):
+    """
+    Return the (first, last) day that a YYYY[-MM[-DD]] string could refer to.
+
+    "2017" covers all of 2017, "2017-02" all of February 2017 and "2017-02-16" only
+    that day.  Blank or unparseable values (including year 0) return (None, None),
+    meaning "unknown".  Trailing time information is ignored, as are out-of-range months
+    or days, in which case the value is treated as the coarser year or month.
+    """
+    match = PARTIAL_DATE_RE.match(value or "")
+    if not match or not int(match.group(1)):
+        return None, None
+
+    year, month, day = match.groups()
+    year = int(year)
+    if month and 1 <= int(month) <= 12:
+        month = int(month)
+        last_day = calendar.monthrange(year, month)[1]
+        if day and 1 <= int(day) <= last_day:
+            day = datetime.date(year, month, int(day))
+            return day, day
+        return datetime.date(year, month, 1), datetime.date(year, month, last_day)
+    return datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+
+
+def partial_date_range(start, end):
+    """
+    Return the inclusive (lower, upper) dates spanned by a pair of partial date strings.
+
+    The range runs from the earliest day ``start`` could refer to through the latest day
+    ``end`` could refer to, so a membership from "2017" to "2018-06" covers 2017-01-01
+    through 2018-06-30.  A blank start or end leaves that side of the range unbounded
+    (None).  If either can't be parsed, or the end falls before the start, the dates are
+    unknown or inconsistent and None is returned instead, callers should treat that as
+    an empty range.
+    """
+    lower = partial_date_bounds(start)[0]
+    upper = partial_date_bounds(end)[1]
+    if (start and not lower) or (end and not upper):
+        return None
+    if lower and upper and upper < lower:
+        return None
+    return lower, upper
+
+
+def _midnight(day):
+    return datetime.datetime.combine(day, datetime.time(), datetime.timezone.utc)
+
+
+def _utc_offset(value):
+    if not value or value.upper() == "Z":
+        return datetime.timezone.utc
+    sign = -1 if value[0] == "-" else 1
+    digits = value[1:].replace(":", "")
+    hours, minutes = int(digits[:2]), int(digits[2:] or 0)
+    return datetime.timezone(sign * datetime.timedelta(hours=hours, minutes=minutes))
+
+
+def parse_timestamp(value):
+    """
+    Return the (timestamp, precision) of a YYYY-MM-DD[ HH:MM[:SS]][+HH:MM] string.
+
+    The timestamp is a UTC datetime for the start of whatever the string refers to, so
+    "2017-02" is 2017-02-01 00:00 UTC with a precision of MONTH.  Times without an offset
+    are taken to be UTC.  Out-of-range parts are dropped as in partial_date_bounds, and a
+    time that can't be read leaves just the date.  Blank or unparseable values return
+    (None, "").
+    """
+    match = PARTIAL_DATE_RE.match(value or "")
+    if not match:
+        return None, ""
+
+    first, last = partial_date_bounds(value)
+    if first is None:
+        return None, ""
+    if first != last:
+        precision = MONTH if first.month == last.month else YEAR
+        return _midnight(first), precision
+
+    time = TIME_RE.match(value[match.end():])
+    if not time:
+        return _midnight(first), DAY
+
+    hour, minute, second, fraction, offset = time.groups()
+    try:
+        timestamp = datetime.datetime.combine(
+            first,
+            datetime.time(
+                int(hour), int(minute), int(second or 0), int((fraction or "0").ljust(6, "0"))
+            ),
+            _utc_offset(offset),
+        )
+    except ValueError:
+        return _midnight(first), DAY
+    return timestamp.astimezone(datetime.timezone.utc), SECOND if second else MINUTE
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("elections", "0008_auto_20181029_1527")]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name="electionidentifier", index_together={("scheme", "identifier")}
+        ),
+        migrations.AlterIndexTogether(
+            name="ballotmeasurecontestidentifier",
+            index_together={("scheme", "identifier")},
+        ),
+        migrations.AlterIndexTogether(
+            name="retentioncontestidentifier",
+            index_together={("scheme", "identifier")},
+        ),
+        migrations.AlterIndexTogether(
+            name="candidatecontestidentifier",
+            index_together={("scheme", "identifier")},
+        ),
+        migrations.AlterIndexTogether(
+            name="partycontestidentifier", index_together={("scheme", "identifier")}
+        ),
+    ]
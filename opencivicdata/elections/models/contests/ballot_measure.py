@@ -88,7 +88,7 @@ class BallotMeasureContestIdentifier(IdentifierBase):
         tmpl = "%s identifies %s"
         return tmpl % (self.identifier, self.contest)
 
-    class Meta:
+    class Meta(IdentifierBase.Meta):
         db_table = "opencivicdata_ballotmeasurecontestidentifier"
 
 
@@ -187,7 +187,7 @@ class RetentionContestIdentifier(IdentifierBase):
         tmpl = "%s identifies %s"
         return tmpl % (self.identifier, self.contest)
 
-    class Meta:
+    class Meta(IdentifierBase.Meta):
         db_table = "opencivicdata_retentionidentifier"
 
 
@@ -4,7 +4,7 @@
 Base classes for contest-related models.
 """
 from django.db import models
-from opencivicdata.core.models.base import OCDBase, OCDIDField
+from opencivicdata.core.models.base import OCDBase, OCDIDField, IdentifierQuerySet
 from opencivicdata.core.models import Division
 from ..election import Election
 
@@ -17,6 +17,8 @@ class ContestBase(OCDBase):
     CandidateContest, PartyContest and RetentionContest.
     """
 
+    objects = IdentifierQuerySet.as_manager()
+
     id = OCDIDField(
         ocd_type="contest",
         help_text="Open Civic Data-style id in the format ``ocd-contest/{{uuid}}``.",
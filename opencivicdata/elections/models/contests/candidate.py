@@ -110,7 +110,7 @@ class CandidateContestIdentifier(IdentifierBase):
         tmpl = "%s identifies %s"
         return tmpl % (self.identifier, self.contest)
 
-    class Meta:
+    class Meta(IdentifierBase.Meta):
         db_table = "opencivicdata_candidatecontestidentifier"
 
 
@@ -85,7 +85,7 @@ class PartyContestIdentifier(IdentifierBase):
         tmpl = "%s identifies %s"
         return tmpl % (self.identifier, self.contest)
 
-    class Meta:
+    class Meta(IdentifierBase.Meta):
         db_table = "opencivicdata_partyidentifier"
 
 
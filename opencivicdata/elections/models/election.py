@@ -4,7 +4,13 @@
 Election-related models.
 """
 from django.db import models
-from opencivicdata.core.models.base import OCDBase, IdentifierBase, LinkBase, OCDIDField
+from opencivicdata.core.models.base import (
+    OCDBase,
+    IdentifierBase,
+    IdentifierQuerySet,
+    LinkBase,
+    OCDIDField,
+)
 from opencivicdata.core.models import Division, Organization
 
 
@@ -13,6 +19,8 @@ class Election(OCDBase):
     A collection of political contests set to be decided on the same date within a Division.
     """
 
+    objects = IdentifierQuerySet.as_manager()
+
     id = OCDIDField(
         ocd_type="election",
         help_text="Open Civic Data-style id in the format ``ocd-election/{{uuid}}``.",
@@ -68,7 +76,7 @@ class ElectionIdentifier(IdentifierBase):
         on_delete=models.CASCADE,
     )
 
-    class Meta:
+    class Meta(IdentifierBase.Meta):
         db_table = "opencivicdata_electionidentifier"
 
     def __str__(self):
@@ -0,0 +1,31 @@
+"""
+Normalisation of bill identifiers.
+
+Sources refer to the same bill as "HB 1", "H.B. 1", "HB0001" or "hb1", all of which
+normalise to "HB1" so they can be matched with a simple equality test.
+"""
+import re
+
+_SEPARATORS_RE = re.compile(r"[^A-Za-z0-9]+")
+_LEADING_ZEROS_RE = re.compile(r"(^|[^0-9])0+([0-9])")
+_DIGIT_GROUPS_RE = re.compile(r"([0-9]) (?=[0-9])")
+
+# the same normalisation as a SQL expression, for set-based matching in the database
+NORMALIZED_BILL_IDENTIFIER_SQL = (
+    "upper(replace(regexp_replace(regexp_replace("
+    "regexp_replace({}, '(^|[^0-9])0+([0-9])', '\\1\\2', 'g'), "
+    "'[^A-Za-z0-9]+', ' ', 'g'), '([0-9]) (?=[0-9])', '\\1-', 'g'), ' ', ''))"
+)
+
+
+def normalize_bill_identifier(identifier):
+    """
+    Upper case an identifier and strip punctuation, whitespace and zero padding.
+
+    Zero padding is stripped from each group of digits, and adjacent groups of digits
+    stay apart as "-", so "AB 10-001" (AB10-1) is distinct from both "AB 101" and
+    "AB 10001".
+    """
+    identifier = _LEADING_ZEROS_RE.sub(r"\1\2", identifier or "")
+    identifier = _DIGIT_GROUPS_RE.sub(r"\1-", _SEPARATORS_RE.sub(" ", identifier))
+    return identifier.replace(" ", "").upper()
@@ -0,0 +1,192 @@
+"""
+Voting analytics computed with matrix operations over a VoteMatrix.
+
+Only yes & no votes count as positions, other options (absent, abstain, ...) are
+treated as not voting.  Needs numpy, install with ``pip install ccdc-opencivicdata[analytics]``.
+"""
+from .rollcall import OPTION_CODES, VoteMatrix, np
+
+YES, NO = OPTION_CODES["yes"], OPTION_CODES["no"]
+
+
+def _positions(codes):
+    yes = (codes == YES).astype(np.float32)
+    no = (codes == NO).astype(np.float32)
+    return yes, no
+
+
+def agreement(codes):
+    """
+    Pairwise agreement between the people (rows) of a vote matrix's codes.
+
+    Returns (agreement, shared): ``shared[i, j]`` is the number of votes on which both i
+    and j voted yes or no, and ``agreement[i, j]`` the fraction of those on which they
+    voted the same way, NaN if they never both voted.
+    """
+    yes, no = _positions(codes)
+    voted = yes + no
+    same = yes @ yes.T + no @ no.T
+    shared = voted @ voted.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = same / shared
+    return scores, shared.astype(np.int32)
+
+
+def rice_cohesion(codes, members=None):
+    """
+    The Rice index of cohesion of each vote (column), |yes - no| / (yes + no).
+
+    ``members`` is an optional boolean mask of the rows to count.  Returns (yes, no,
+    rice) arrays, rice is NaN for votes with no yes or no votes among the members.
+    """
+    if members is not None:
+        codes = codes[members]
+    yes, no = _positions(codes)
+    yes, no = yes.sum(axis=0), no.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rice = np.abs(yes - no) / (yes + no)
+    return yes.astype(np.int32), no.astype(np.int32), rice
+
+
+def party_majorities(codes, parties):
+    """
+    Each party's majority position on each vote: 1 for yes, -1 for no and 0 for a tie.
+
+    ``parties`` gives the party of each row (None if unknown).  Returns (party keys,
+    positions) with one row of positions per party.
+    """
+    keys = sorted({party for party in parties if party is not None}, key=str)
+    yes, no = _positions(codes)
+    positions = np.zeros((len(keys), codes.shape[1]), dtype=np.int8)
+    for i, key in enumerate(keys):
+        members = np.array([party == key for party in parties], dtype=bool)
+        positions[i] = np.sign(yes[members].sum(axis=0) - no[members].sum(axis=0))
+    return keys, positions
+
+
+def party_unity(codes, parties):
+    """
+    How often each person voted with their party on party unity votes.
+
+    A party unity vote is one where the majorities of two parties took opposite sides.
+    Returns (scores, counts): ``counts[i]`` is the number of party unity votes person i
+    voted yes or no on while their party had a majority position, and ``scores[i]`` the
+    fraction of those they voted with it, NaN for people without a party or such votes.
+    """
+    keys, positions = party_majorities(codes, parties)
+    unity_votes = (positions == 1).any(axis=0) & (positions == -1).any(axis=0)
+
+    party_rows = {key: i for i, key in enumerate(keys)}
+    person_positions = np.zeros(codes.shape, dtype=np.int8)
+    for i, party in enumerate(parties):
+        if party is not None:
+            person_positions[i] = positions[party_rows[party]]
+
+    yes, no = codes == YES, codes == NO
+    counted = (yes | no) & (person_positions != 0) & unity_votes
+    with_party = counted & ((yes & (person_positions == 1)) | (no & (person_positions == -1)))
+    counts = counted.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = with_party.sum(axis=1) / counts
+    return scores, counts.astype(np.int32)
+
+
+def session_parties(legislative_session, person_ids):
+    """ the party organization id of each person during a session, or None """
+    from opencivicdata.core.models import Membership
+    from opencivicdata.core.models.people_orgs import DateRange
+    from opencivicdata.dates import partial_date_range
+
+    memberships = Membership.objects.filter(
+        person_id__in=person_ids, organization__classification="party"
+    )
+    bounds = partial_date_range(legislative_session.start_date, legislative_session.end_date)
+    if bounds:
+        memberships = memberships.filter(date_range__overlap=DateRange(*bounds, "[]"))
+    # the latest party someone joined during the session wins
+    party = dict(
+        memberships.order_by("start_date").values_list("person_id", "organization_id")
+    )
+    return [party.get(person_id) for person_id in person_ids]
+
+
+def update_vote_summaries(legislative_session, organization, matrix=None):
+    """
+    Recompute the vote summary tables for the votes of an organization in a session.
+
+    Replaces the PersonVoteSummary, PersonVoteAgreement and VoteEventCohesion rows of
+    the session & organization, returning the VoteMatrix they were computed from.
+    """
+    from django.db import transaction
+    from .models import PersonVoteAgreement, PersonVoteSummary, VoteEventCohesion
+
+    if matrix is None:
+        matrix = VoteMatrix.for_session(legislative_session, organization)
+    codes = matrix.matrix
+    parties = session_parties(legislative_session, matrix.person_ids)
+
+    scores, shared = agreement(codes)
+    unity, unity_counts = party_unity(codes, parties)
+    yes, no = _positions(codes)
+    cast = (yes + no).sum(axis=1).astype(int)
+    recorded = (codes != 0).sum(axis=1)
+
+    summaries = [
+        PersonVoteSummary(
+            legislative_session=legislative_session,
+            organization=organization,
+            person_id=person_id,
+            party_id=parties[i],
+            votes_cast=int(cast[i]),
+            votes_recorded=int(recorded[i]),
+            party_unity=None if np.isnan(unity[i]) else float(unity[i]),
+            party_unity_votes=int(unity_counts[i]),
+        )
+        for i, person_id in enumerate(matrix.person_ids)
+    ]
+
+    rows, columns = np.nonzero(shared)
+    agreements = [
+        PersonVoteAgreement(
+            legislative_session=legislative_session,
+            organization=organization,
+            person_id=matrix.person_ids[i],
+            other_person_id=matrix.person_ids[j],
+            agreement=float(scores[i, j]),
+            shared_votes=int(shared[i, j]),
+        )
+        for i, j in zip(rows.tolist(), columns.tolist())
+        if i != j
+    ]
+
+    cohesions = []
+    groups = [(None, None)] + [
+        (party, np.array([p == party for p in parties], dtype=bool))
+        for party in sorted({p for p in parties if p is not None})
+    ]
+    for party, members in groups:
+        party_yes, party_no, rice = rice_cohesion(codes, members)
+        for j, vote_event_id in enumerate(matrix.vote_event_ids):
+            if party_yes[j] or party_no[j]:
+                cohesions.append(
+                    VoteEventCohesion(
+                        vote_event_id=vote_event_id,
+                        party_id=party,
+                        yes_count=int(party_yes[j]),
+                        no_count=int(party_no[j]),
+                        rice_index=float(rice[j]),
+                    )
+                )
+
+    with transaction.atomic():
+        PersonVoteSummary.objects.filter(
+            legislative_session=legislative_session, organization=organization
+        ).delete()
+        PersonVoteAgreement.objects.filter(
+            legislative_session=legislative_session, organization=organization
+        ).delete()
+        VoteEventCohesion.objects.filter(vote_event_id__in=matrix.vote_event_ids).delete()
+        PersonVoteSummary.objects.bulk_create(summaries, batch_size=5000)
+        PersonVoteAgreement.objects.bulk_create(agreements, batch_size=5000)
+        VoteEventCohesion.objects.bulk_create(cohesions, batch_size=5000)
+    return matrix
@@ -0,0 +1,158 @@
+"""
+Co-sponsorship networks: which legislators sponsored which bills, as sparse matrices.
+
+Needs numpy & scipy, install with ``pip install ccdc-opencivicdata[analytics]``.
+
+    matrix = SponsorshipMatrix.for_session(session)
+    matrix.collaborators(person_id, k=5)        # [(person id, bills shared), ...]
+    matrix.save("sponsorships-2017.npz")
+    matrix.write_edges(open("cosponsors-2017.csv", "w"))
+"""
+import csv
+from array import array
+
+try:
+    import numpy as np
+    import scipy.sparse as sparse
+except ImportError:
+    np = sparse = None
+
+
+def _require_scipy():
+    if sparse is None:
+        raise ImportError(
+            "numpy & scipy are required for sponsorship matrices, install the analytics extra"
+        )
+
+
+class SponsorshipMatrix(object):
+    """
+    A sparse bills × people incidence matrix of sponsorships.
+
+    ``incidence[i, j]`` is 1 if ``person_ids[j]`` sponsored ``bill_ids[i]``.  Bills and
+    people are sorted by id.  Only sponsorships resolved to a person are included.
+    """
+
+    def __init__(self, incidence, bill_ids, person_ids):
+        self.incidence = incidence
+        self.bill_ids = bill_ids
+        self.person_ids = person_ids
+        self._adjacency = None
+        self._person_index = None
+
+    def person_index(self, person_id):
+        if self._person_index is None:
+            self._person_index = {pid: i for i, pid in enumerate(self.person_ids)}
+        return self._person_index[person_id]
+
+    @classmethod
+    def from_sponsorships(cls, sponsorships):
+        """ build a matrix from an iterable of (bill id, person id) """
+        _require_scipy()
+        bill_index, person_index = {}, {}
+        rows, columns = array("l"), array("l")
+        for bill_id, person_id in sponsorships:
+            rows.append(bill_index.setdefault(bill_id, len(bill_index)))
+            columns.append(person_index.setdefault(person_id, len(person_index)))
+
+        bill_ids, person_ids = sorted(bill_index), sorted(person_index)
+        renumber_bills = np.empty(len(bill_ids), dtype=np.intp)
+        for new, bill_id in enumerate(bill_ids):
+            renumber_bills[bill_index[bill_id]] = new
+        renumber_people = np.empty(len(person_ids), dtype=np.intp)
+        for new, person_id in enumerate(person_ids):
+            renumber_people[person_index[person_id]] = new
+
+        rows = renumber_bills[np.frombuffer(rows, dtype=np.dtype("l"))]
+        columns = renumber_people[np.frombuffer(columns, dtype=np.dtype("l"))]
+        incidence = sparse.coo_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+            shape=(len(bill_ids), len(person_ids)),
+        ).tocsr()
+        # someone listed twice on a bill still only sponsored it once
+        incidence.data[:] = 1
+        return cls(incidence, bill_ids, person_ids)
+
+    @classmethod
+    def for_session(
+        cls, legislative_session=None, jurisdiction=None, primary=None, chunk_size=10000
+    ):
+        """
+        The matrix of the sponsorships in a session or jurisdiction.
+
+        ``primary`` limits it to primary sponsors (True) or cosponsors (False).
+        Sponsorships are streamed from the database with a values_list iterator.
+        """
+        from .models import BillSponsorship
+
+        sponsorships = BillSponsorship.objects.filter(person__isnull=False)
+        if legislative_session:
+            sponsorships = sponsorships.filter(
+                bill__legislative_session_id=getattr(
+                    legislative_session, "pk", legislative_session
+                )
+            )
+        if jurisdiction:
+            sponsorships = sponsorships.filter(
+                bill__legislative_session__jurisdiction_id=getattr(
+                    jurisdiction, "pk", jurisdiction
+                )
+            )
+        if primary is not None:
+            sponsorships = sponsorships.filter(primary=primary)
+        sponsorships = sponsorships.order_by().values_list("bill_id", "person_id")
+        return cls.from_sponsorships(sponsorships.iterator(chunk_size=chunk_size))
+
+    @property
+    def adjacency(self):
+        """
+        The sparse people × people co-sponsorship matrix, the number of bills each pair
+        both sponsored.  The diagonal is zero.
+        """
+        if self._adjacency is None:
+            adjacency = (self.incidence.T @ self.incidence).tocsr()
+            adjacency.setdiag(0)
+            adjacency.eliminate_zeros()
+            self._adjacency = adjacency
+        return self._adjacency
+
+    def collaborators(self, person_id, k=10):
+        """ the ``k`` people who cosponsored most often with a person, most first """
+        row = self.adjacency[self.person_index(person_id)]
+        # most shared bills first, ties in person id order
+        top = np.lexsort((row.indices, -row.data))[:k]
+        return [(self.person_ids[row.indices[i]], int(row.data[i])) for i in top]
+
+    def edges(self):
+        """ (person id, other person id, bills shared) for every pair, each pair once """
+        upper = sparse.triu(self.adjacency, k=1).tocoo()
+        for i, j, shared in zip(upper.row.tolist(), upper.col.tolist(), upper.data.tolist()):
+            yield self.person_ids[i], self.person_ids[j], shared
+
+    def write_edges(self, file):
+        """ write the co-sponsorship edge list as CSV """
+        writer = csv.writer(file)
+        writer.writerow(["person_id", "other_person_id", "shared_bills"])
+        writer.writerows(self.edges())
+
+    def save(self, path):
+        """ save the incidence matrix to a compressed .npz file """
+        incidence = self.incidence.tocsr()
+        np.savez_compressed(
+            path,
+            data=incidence.data,
+            indices=incidence.indices,
+            indptr=incidence.indptr,
+            shape=incidence.shape,
+            bill_ids=np.array(self.bill_ids, dtype=str),
+            person_ids=np.array(self.person_ids, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path):
+        _require_scipy()
+        with np.load(path) as data:
+            incidence = sparse.csr_matrix(
+                (data["data"], data["indices"], data["indptr"]), shape=tuple(data["shape"])
+            )
+            return cls(incidence, data["bill_ids"].tolist(), data["person_ids"].tolist())
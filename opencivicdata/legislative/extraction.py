@@ -0,0 +1,155 @@
+"""
+Text extraction from bill version documents, used to populate SearchableBill.
+
+Everything here runs without Django so that it can be handed to worker processes.
+PDF support needs the optional pdfminer.six package (``pip install ccdc-opencivicdata[pdf]``).
+"""
+import hashlib
+import io
+import os
+import urllib.request
+from html.parser import HTMLParser
+
+try:
+    from pdfminer.high_level import extract_text as pdf_to_text
+except ImportError:
+    pdf_to_text = None
+
+HTML, PLAIN, PDF = "html", "plain", "pdf"
+
+# media types that text can be extracted from, best first
+MEDIA_TYPES = (
+    ("text/html", HTML),
+    ("application/xhtml+xml", HTML),
+    ("text/plain", PLAIN),
+    ("application/pdf", PDF),
+)
+MEDIA_TYPE_RANKS = {media_type: rank for rank, (media_type, _) in enumerate(MEDIA_TYPES)}
+MEDIA_TYPE_FORMATS = dict(MEDIA_TYPES)
+
+
+def base_media_type(media_type):
+    """ "text/html; charset=utf-8" -> "text/html" """
+    return (media_type or "").split(";")[0].strip().lower()
+
+
+def best_version_links(links):
+    """
+    Pick the link to extract each bill's text from.
+
+    ``links`` is an iterable of (link id, bill id, url, media type, version date), the
+    link chosen for a bill is from its latest version, in the best media type that
+    version has.  Returns a dict of bill id to (link id, url, media type), bills without
+    any usable link are left out.
+    """
+    best = {}
+    for link_id, bill_id, url, media_type, version_date in links:
+        rank = MEDIA_TYPE_RANKS.get(base_media_type(media_type))
+        if rank is None:
+            continue
+        # later versions win, then better media types, then whichever came first
+        key = (version_date or "", -rank)
+        if bill_id not in best or key > best[bill_id][0]:
+            best[bill_id] = (key, (link_id, url, media_type))
+    return {bill_id: link for bill_id, (_, link) in best.items()}
+
+
+def fetch_url(url, timeout=60):
+    """ the default fetcher, also handles file:// urls for documents available locally """
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+class _HTMLTextParser(HTMLParser):
+    SKIPPED_TAGS = {"script", "style", "head"}
+
+    def __init__(self):
+        super(_HTMLTextParser, self).__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self.skipping:
+            self.skipping -= 1
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+
+def normalize_text(text):
+    """ collapse whitespace and drop the NUL characters PostgreSQL can't store """
+    return " ".join(text.replace("\x00", " ").split())
+
+
+def text_sha256(text):
+    """ the key of a normalized text in the BillText store """
+    return hashlib.sha256(text.encode("utf8")).hexdigest()
+
+
+def extract_text(data, media_type):
+    """ the normalized text of a document's bytes """
+    text_format = MEDIA_TYPE_FORMATS.get(base_media_type(media_type))
+    if text_format == PDF:
+        if pdf_to_text is None:
+            raise ValueError("pdfminer.six is required to extract text from PDFs")
+        text = pdf_to_text(io.BytesIO(data))
+    elif text_format == HTML:
+        parser = _HTMLTextParser()
+        parser.feed(data.decode("utf8", "replace"))
+        parser.close()
+        text = " ".join(parser.parts)
+    elif text_format == PLAIN:
+        text = data.decode("utf8", "replace")
+    else:
+        raise ValueError("can't extract text from {}".format(media_type))
+    return normalize_text(text)
+
+
+def extract_document(document, fetcher=fetch_url):
+    """
+    Fetch & extract a (url, media type) pair, returning (text, error).
+
+    Failures are returned as an error message rather than raised, so that one bad
+    document doesn't take down a whole batch of workers.
+    """
+    url, media_type = document
+    try:
+        text = extract_text(fetcher(url), media_type)
+    except Exception as e:
+        return "", "{}: {}".format(type(e).__name__, e)
+    if not text:
+        return "", "no text found"
+    return text, None
+
+
+def fetch_document(url, directory, fetcher=fetch_url):
+    """
+    Fetch ``url`` into ``directory``, returning (sha256 of its bytes, path, error).
+
+    Documents are named by their hash, so the same document fetched under several urls
+    is only written, and later extracted, once.
+    """
+    try:
+        data = fetcher(url)
+    except Exception as e:
+        return "", "", "{}: {}".format(type(e).__name__, e)
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(directory, digest)
+    with open(path, "wb") as f:
+        f.write(data)
+    return digest, path, None
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def extract_file(document):
+    """ extract a (path, media type) pair fetched by fetch_document, returning (text, error) """
+    return extract_document(document, fetcher=read_file)
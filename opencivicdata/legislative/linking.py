@@ -0,0 +1,401 @@
+"""
+Bulk linking of the unresolved references left behind by imports.
+"""
+import re
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import F, Q
+
+from opencivicdata.core.models import Jurisdiction
+from opencivicdata.core.resolvers import OrganizationNameResolver, PersonNameResolver
+from ..dates import partial_date_bounds
+from ..identifiers import NORMALIZED_BILL_IDENTIFIER_SQL
+from .models import (
+    BillActionRelatedEntity,
+    BillSponsorship,
+    EventParticipant,
+    EventRelatedEntity,
+    PersonVote,
+    VoteEvent,
+)
+from .models.bill import invalidate_bill_facets
+
+# RelatedEntityBase subclasses and the lookup from each to its jurisdiction
+RELATED_ENTITY_MODELS = {
+    "billsponsorship": (BillSponsorship, "bill__legislative_session__jurisdiction_id"),
+    "billactionrelatedentity": (
+        BillActionRelatedEntity,
+        "action__bill__legislative_session__jurisdiction_id",
+    ),
+    "eventparticipant": (EventParticipant, "event__jurisdiction_id"),
+    "eventrelatedentity": (EventRelatedEntity, "agenda_item__event__jurisdiction_id"),
+}
+
+# point unresolved related bills at the one bill in the same jurisdiction with a matching
+# session identifier & normalized identifier, skipping any that are ambiguous
+LINK_RELATED_BILLS_SQL = """
+UPDATE opencivicdata_relatedbill SET related_bill_id = candidates.related_bill_id
+FROM (
+    SELECT rb.id, MIN(target.id) AS related_bill_id
+    FROM opencivicdata_relatedbill rb
+    JOIN opencivicdata_bill source ON source.id = rb.bill_id
+    JOIN opencivicdata_legislativesession source_session
+        ON source_session.id = source.legislative_session_id
+    JOIN opencivicdata_legislativesession target_session
+        ON target_session.jurisdiction_id = source_session.jurisdiction_id
+        AND target_session.identifier = rb.legislative_session
+    JOIN opencivicdata_bill target
+        ON target.legislative_session_id = target_session.id
+        AND target.normalized_identifier = {normalized_identifier}
+    WHERE rb.related_bill_id IS NULL AND {where}
+    GROUP BY rb.id
+    HAVING COUNT(*) = 1
+) candidates
+WHERE opencivicdata_relatedbill.id = candidates.id
+"""
+
+# the action classifications that record the outcome of a vote, by motion & result
+VOTE_ACTION_CLASSIFICATIONS = {
+    ("bill-passage", "pass"): {
+        "passage",
+        "committee-passage",
+        "committee-passage-favorable",
+        "committee-passage-unfavorable",
+    },
+    ("bill-passage", "fail"): {"failure", "committee-failure"},
+    ("amendment-passage", "pass"): {"amendment-passage"},
+    ("amendment-passage", "fail"): {"amendment-failure"},
+    ("veto-override", "pass"): {"veto-override-passage"},
+    ("veto-override", "fail"): {"veto-override-failure"},
+}
+
+# unlinked votes & actions on the same bill, by the same organization on the same day
+VOTE_ACTION_CANDIDATES_SQL = """
+SELECT
+    ve.bill_id, ve.id, ve.motion_classification, ve.result, ve.motion_text,
+    ba.id, ba.classification, ba.description
+FROM opencivicdata_voteevent ve
+JOIN opencivicdata_legislativesession ls ON ls.id = ve.legislative_session_id
+JOIN opencivicdata_billaction ba
+    ON ba.bill_id = ve.bill_id
+    AND ba.organization_id = ve.organization_id
+    AND left(ba.date, 10) = left(ve.start_date, 10)
+WHERE ve.bill_action_id IS NULL
+    AND ve.start_precision IN ('day', 'minute', 'second')
+    AND ba.date_precision IN ('day', 'minute', 'second')
+    AND NOT EXISTS (
+        SELECT 1 FROM opencivicdata_voteevent linked WHERE linked.bill_action_id = ba.id
+    )
+    AND {where}
+ORDER BY ve.bill_id, ve.id, ba."order"
+"""
+
+WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
+
+def resolve_related_entities(
+    model_name,
+    jurisdiction=None,
+    after=None,
+    chunk_size=5000,
+    person_resolver=None,
+    organization_resolver=None,
+    progress=None,
+):
+    """
+    Link unresolved people & organizations on a RelatedEntityBase model by name.
+
+    Rows whose entity_type is "person" or "organization" but whose matching foreign key
+    is NULL are walked in primary key order ``chunk_size`` at a time, each chunk resolved
+    in memory against the people and organizations of the row's jurisdiction, and the
+    links written back with a single bulk_update.  Names that are unknown or ambiguous
+    are left alone, so it is safe to run repeatedly.
+
+    Processing can be resumed from the last id reported to ``progress``, which is called
+    after every chunk with a dict of running totals, by passing it as ``after``.
+    """
+    model, jurisdiction_lookup = RELATED_ENTITY_MODELS[model_name]
+    person_resolver = person_resolver or PersonNameResolver()
+    organization_resolver = organization_resolver or OrganizationNameResolver()
+
+    unresolved = model.objects.filter(
+        Q(entity_type="person", person__isnull=True)
+        | Q(entity_type="organization", organization__isnull=True)
+    ).annotate(entity_jurisdiction=F(jurisdiction_lookup))
+    if jurisdiction:
+        unresolved = unresolved.filter(
+            entity_jurisdiction=getattr(jurisdiction, "pk", jurisdiction)
+        )
+
+    stats = {"scanned": 0, "resolved": 0, "ambiguous": 0, "last_id": after}
+    while True:
+        chunk = unresolved.order_by("id")
+        if stats["last_id"]:
+            chunk = chunk.filter(id__gt=stats["last_id"])
+        chunk = list(chunk.only("id", "name", "entity_type")[:chunk_size])
+        if not chunk:
+            break
+
+        names = defaultdict(set)
+        for entity in chunk:
+            names[(entity.entity_type, entity.entity_jurisdiction)].add(entity.name)
+        matches = {}
+        for (entity_type, jurisdiction_id), batch in names.items():
+            if entity_type == "person":
+                found = person_resolver.resolve(batch, jurisdiction=jurisdiction_id)
+            else:
+                found = organization_resolver.resolve(batch, jurisdiction=jurisdiction_id)
+            for name, match in found.items():
+                matches[(entity_type, jurisdiction_id, name)] = match
+
+        resolved = defaultdict(list)
+        for entity in chunk:
+            match = matches[(entity.entity_type, entity.entity_jurisdiction, entity.name)]
+            if match.id:
+                setattr(entity, "{}_id".format(entity.entity_type), match.id)
+                resolved[entity.entity_type].append(entity)
+            elif match.ambiguous:
+                stats["ambiguous"] += 1
+        # only the field that was set, the other one is deferred
+        for entity_type, entities in resolved.items():
+            model.objects.bulk_update(entities, [entity_type])
+
+        stats["scanned"] += len(chunk)
+        stats["resolved"] += sum(len(entities) for entities in resolved.values())
+        stats["last_id"] = chunk[-1].id
+        if progress:
+            progress(dict(stats))
+
+    # bulk_update bypasses save(), newly resolved sponsors can change party facets
+    if model is BillSponsorship and stats["resolved"]:
+        invalidate_bill_facets()
+    return stats
+
+
+def link_related_bills(jurisdiction=None, legislative_session=None, progress=None):
+    """
+    Fill in RelatedBill.related_bill wherever the target bill can now be found.
+
+    Matching happens in the database, one UPDATE per jurisdiction (or just the given
+    jurisdiction or source session), against Bill.normalized_identifier.  Only rows that
+    are still unresolved are considered, so it is cheap to rerun after every import.
+
+    Returns the number of related bills that were linked, ``progress`` is called with the
+    jurisdiction id and count after each jurisdiction.
+    """
+    sql = LINK_RELATED_BILLS_SQL.format(
+        normalized_identifier=NORMALIZED_BILL_IDENTIFIER_SQL.format("rb.identifier"),
+        where="{}",
+    )
+    if legislative_session:
+        session_id = getattr(legislative_session, "pk", legislative_session)
+        scopes = [("source.legislative_session_id = %s", session_id)]
+    elif jurisdiction:
+        scopes = [
+            ("source_session.jurisdiction_id = %s", getattr(jurisdiction, "pk", jurisdiction))
+        ]
+    else:
+        scopes = [
+            ("source_session.jurisdiction_id = %s", jurisdiction_id)
+            for jurisdiction_id in Jurisdiction.objects.values_list("id", flat=True)
+        ]
+
+    linked = 0
+    for where, param in scopes:
+        with connection.cursor() as cursor:
+            cursor.execute(sql.format(where), [param])
+            linked += cursor.rowcount
+        if progress:
+            progress(param, cursor.rowcount)
+    return linked
+
+
+def _roster_date(start_date):
+    """ the day a vote was held on, None if start_date is vaguer than that """
+    first, last = partial_date_bounds(start_date)
+    return first if first == last else None
+
+
+def resolve_voters(
+    legislative_session=None,
+    jurisdiction=None,
+    after=None,
+    chunk_size=5000,
+    person_resolver=None,
+    progress=None,
+):
+    """
+    Link PersonVote.voter by voter_name against who sat in the chamber on the day.
+
+    Each name is matched against the members of the vote event's organization as of its
+    start date (or anyone who was ever a member, if the date is vaguer than a day), so
+    "Smith" resolves whenever only one Smith was seated at the time.  Unresolved votes are
+    walked in primary key order ``chunk_size`` at a time and written back with a single
+    bulk_update per chunk, the rosters being loaded once per organization & day and
+    shared across chunks.
+
+    Takes the same ``after`` & ``progress`` arguments as resolve_related_entities and
+    returns the same totals.
+    """
+    person_resolver = person_resolver or PersonNameResolver()
+
+    unresolved = PersonVote.objects.filter(voter__isnull=True).exclude(voter_name="")
+    if legislative_session:
+        unresolved = unresolved.filter(
+            vote_event__legislative_session_id=getattr(
+                legislative_session, "pk", legislative_session
+            )
+        )
+    if jurisdiction:
+        unresolved = unresolved.filter(
+            vote_event__legislative_session__jurisdiction_id=getattr(
+                jurisdiction, "pk", jurisdiction
+            )
+        )
+    unresolved = unresolved.order_by("id").values_list(
+        "id", "voter_name", "vote_event__organization_id", "vote_event__start_date"
+    )
+
+    stats = {"scanned": 0, "resolved": 0, "ambiguous": 0, "last_id": after}
+    while True:
+        chunk = unresolved
+        if stats["last_id"]:
+            chunk = chunk.filter(id__gt=stats["last_id"])
+        chunk = [
+            (vote_id, name, organization_id, _roster_date(start_date))
+            for vote_id, name, organization_id, start_date in chunk[:chunk_size]
+        ]
+        if not chunk:
+            break
+
+        names = defaultdict(set)
+        for _, name, organization_id, day in chunk:
+            names[(organization_id, day)].add(name)
+        matches = {}
+        for (organization_id, day), batch in names.items():
+            found = person_resolver.resolve(batch, organization=organization_id, date=day)
+            for name, match in found.items():
+                matches[(organization_id, day, name)] = match
+
+        resolved = []
+        for vote_id, name, organization_id, day in chunk:
+            match = matches[(organization_id, day, name)]
+            if match.id:
+                resolved.append(PersonVote(id=vote_id, voter_id=match.id))
+            elif match.ambiguous:
+                stats["ambiguous"] += 1
+        PersonVote.objects.bulk_update(resolved, ["voter"])
+
+        stats["scanned"] += len(chunk)
+        stats["resolved"] += len(resolved)
+        stats["last_id"] = chunk[-1][0]
+        if progress:
+            progress(dict(stats))
+
+    return stats
+
+
+def _words(text):
+    return set(WORD_RE.findall(text.lower()))
+
+
+def score_vote_action(motion_classification, result, motion_text, classification, description):
+    """
+    How well an action describes a vote, 0 if not at all.
+
+    Each action classification expected for the vote's motion classifications & result
+    counts 1, plus the overlap (0 to 1) between the words of the motion & description.
+    """
+    expected = set()
+    for motion in motion_classification:
+        expected |= VOTE_ACTION_CLASSIFICATIONS.get((motion, result), set())
+    motion_words, description_words = _words(motion_text), _words(description)
+    overlap = 0.0
+    if motion_words and description_words:
+        overlap = len(motion_words & description_words) / len(motion_words | description_words)
+    return len(expected.intersection(classification)) + overlap
+
+
+def pair_votes_with_actions(scores):
+    """
+    Pick a one-to-one pairing from a dict of (vote event id, action id) to score.
+
+    A vote & action are paired when each is the other's single best option, repeatedly
+    until no more pairs can be made.  Ties are left unpaired rather than guessed.
+    """
+    scores = {pair: score for pair, score in scores.items() if score > 0}
+    pairs = {}
+    while True:
+        best_for_vote, best_for_action = {}, {}
+        for (vote_id, action_id), score in scores.items():
+            for best, key, other in (
+                (best_for_vote, vote_id, action_id),
+                (best_for_action, action_id, vote_id),
+            ):
+                current = best.get(key)
+                if current is None or score > current[0]:
+                    best[key] = (score, other)
+                elif score == current[0]:
+                    best[key] = (score, None)
+
+        paired = {
+            vote_id: action_id
+            for vote_id, (_, action_id) in best_for_vote.items()
+            if action_id is not None and best_for_action[action_id][1] == vote_id
+        }
+        if not paired:
+            return pairs
+        pairs.update(paired)
+        taken = set(paired.values())
+        scores = {
+            (vote_id, action_id): score
+            for (vote_id, action_id), score in scores.items()
+            if vote_id not in paired and action_id not in taken
+        }
+
+
+def link_vote_actions(jurisdiction=None, legislative_session=None, batch_size=1000):
+    """
+    Fill in VoteEvent.bill_action by pairing votes with the actions that record them.
+
+    Candidates, a bill's unlinked votes & actions by the same organization on the same
+    local calendar day (as written in the source, ignoring any UTC offset), come from a
+    single query streamed in bill order.
+    Each bill's candidates are scored in memory with score_vote_action, paired with
+    pair_votes_with_actions and the links written with bulk_update.  Votes & actions
+    that are already linked are never reconsidered, so it can run after every import.
+
+    Returns the number of vote events linked.
+    """
+    where, params = ["TRUE"], []
+    if jurisdiction:
+        where.append("ls.jurisdiction_id = %s")
+        params.append(getattr(jurisdiction, "pk", jurisdiction))
+    if legislative_session:
+        where.append("ls.id = %s")
+        params.append(getattr(legislative_session, "pk", legislative_session))
+
+    def pair(candidates):
+        return [
+            VoteEvent(id=vote_id, bill_action_id=action_id)
+            for vote_id, action_id in pair_votes_with_actions(candidates).items()
+        ]
+
+    linked = []
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(VOTE_ACTION_CANDIDATES_SQL.format(where=" AND ".join(where)), params)
+        bill_id, candidates = None, {}
+        for row in cursor:
+            if row[0] != bill_id:
+                linked.extend(pair(candidates))
+                bill_id, candidates = row[0], {}
+            candidates[(row[1], row[5])] = score_vote_action(*row[2:5], *row[6:8])
+        linked.extend(pair(candidates))
+
+    for start in range(0, len(linked), batch_size):
+        batch = linked[start:start + batch_size]
+        VoteEvent.objects.bulk_update(batch, ["bill_action"])
+        count += len(batch)
+    return count
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from ...votecounts import derive_vote_counts, vote_count_mismatches, vote_count_summary
+
+
+class Command(BaseCommand):
+    help = "compare vote counts with individual votes, optionally deriving missing counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jurisdiction", help="only check vote events in this jurisdiction")
+        parser.add_argument("--session", help="only check vote events in this legislative session")
+        parser.add_argument(
+            "--details", action="store_true", help="list the options of mismatched vote events"
+        )
+        parser.add_argument("--page-size", type=int, default=1000)
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="create counts from the individual votes of vote events without counts",
+        )
+
+    def handle(self, *args, **options):
+        scope = {"jurisdiction": options["jurisdiction"], "session": options["session"]}
+
+        for session_id, compared, mismatched, missing in vote_count_summary(**scope):
+            self.stdout.write(
+                "{}: {} compared, {} mismatched, {} without counts".format(
+                    session_id, compared, mismatched, missing
+                )
+            )
+
+        if options["details"]:
+            after = None
+            while True:
+                rows = vote_count_mismatches(after=after, limit=options["page_size"], **scope)
+                if not rows:
+                    break
+                for vote_event_id, option, counted, voted in rows:
+                    self.stdout.write(
+                        "{} {}: {} counted, {} votes".format(vote_event_id, option, counted, voted)
+                    )
+                after = rows[-1][0]
+
+        if options["fix"]:
+            self.stdout.write("{} vote counts created".format(derive_vote_counts(**scope)))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from opencivicdata.core.models import Organization
+from ...analytics import update_vote_summaries
+from ...models import LegislativeSession
+
+
+class Command(BaseCommand):
+    help = "recompute vote summaries, agreement & cohesion scores for a legislative session"
+
+    def add_arguments(self, parser):
+        parser.add_argument("session", help="legislative session id")
+        parser.add_argument(
+            "--organization", help="only this organization, defaults to all that voted"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            session = LegislativeSession.objects.get(pk=options["session"])
+        except LegislativeSession.DoesNotExist:
+            raise CommandError("no legislative session {}".format(options["session"]))
+
+        organizations = Organization.objects.filter(votes__legislative_session=session)
+        if options["organization"]:
+            organizations = organizations.filter(pk=options["organization"])
+        for organization in organizations.distinct().order_by("name"):
+            matrix = update_vote_summaries(session, organization)
+            self.stdout.write(
+                "{}: {} people, {} votes".format(organization, *matrix.matrix.shape)
+            )
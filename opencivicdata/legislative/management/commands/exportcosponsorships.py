@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...cosponsorship import SponsorshipMatrix
+
+
+class Command(BaseCommand):
+    help = "export sponsorships as an .npz incidence matrix or a CSV co-sponsorship edge list"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="a .npz file for the matrix, otherwise a CSV edge list")
+        parser.add_argument("--session", help="only bills in this legislative session")
+        parser.add_argument("--jurisdiction", help="only bills in this jurisdiction")
+        parser.add_argument(
+            "--primary", action="store_true", help="only count primary sponsors"
+        )
+
+    def handle(self, *args, **options):
+        if not (options["session"] or options["jurisdiction"]):
+            raise CommandError("one of --session or --jurisdiction is required")
+
+        matrix = SponsorshipMatrix.for_session(
+            legislative_session=options["session"],
+            jurisdiction=options["jurisdiction"],
+            primary=True if options["primary"] else None,
+        )
+        if options["output"].endswith(".npz"):
+            matrix.save(options["output"])
+        else:
+            with open(options["output"], "w", newline="") as f:
+                matrix.write_edges(f)
+        self.stdout.write(
+            "{} bills, {} people, {} co-sponsor pairs".format(
+                len(matrix.bill_ids), len(matrix.person_ids), matrix.adjacency.nnz // 2
+            )
+        )
@@ -0,0 +1,156 @@
+import functools
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from ...extraction import MEDIA_TYPES, best_version_links, extract_file, fetch_document
+from ...models import Bill, BillText, BillTitle, BillVersionLink
+
+# another run may have got to some of these bills first, so conflicts are skipped and only
+# the rows actually inserted are returned (search_vector is filled in by a trigger)
+INSERT_SEARCHABLES_SQL = """
+INSERT INTO opencivicdata_searchablebill
+    (bill_id, version_link_id, all_titles, content_id, is_error, raw_text, created_at)
+SELECT *, '', now()
+FROM unnest(%s::varchar[], %s::uuid[], %s::text[], %s::varchar[], %s::boolean[])
+ON CONFLICT DO NOTHING
+RETURNING is_error
+"""
+
+
+class Command(BaseCommand):
+    help = "extract the text of bills without a SearchableBill from their latest versions"
+
+    # Documents are fetched & hashed first, then only those not seen before are extracted
+    # and their text added to BillText.
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jurisdiction", help="only extract bills in this jurisdiction")
+        parser.add_argument("--session", help="only extract bills in this legislative session id")
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--workers", type=int, default=None, help="worker processes, defaults to one per CPU"
+        )
+        parser.add_argument(
+            "--fetcher",
+            default="opencivicdata.legislative.extraction.fetch_url",
+            help="dotted path of a function that returns the bytes of a url",
+        )
+
+    def handle(self, *args, **options):
+        self.fetcher = import_string(options["fetcher"])
+
+        # bills that haven't been extracted yet, but have something to extract from
+        usable = Q()
+        for media_type, _ in MEDIA_TYPES:
+            usable |= Q(versions__links__media_type__istartswith=media_type)
+        bills = Bill.objects.filter(usable, searchable__isnull=True)
+        if options["jurisdiction"]:
+            bills = bills.filter(legislative_session__jurisdiction_id=options["jurisdiction"])
+        if options["session"]:
+            bills = bills.filter(legislative_session_id=options["session"])
+        bills = bills.values_list("id", flat=True).distinct().order_by("id")
+
+        extracted = errors = 0
+        last_id = None
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            while True:
+                batch = bills if last_id is None else bills.filter(id__gt=last_id)
+                batch = list(batch[:options["batch_size"]])
+                if not batch:
+                    break
+                last_id = batch[-1]
+
+                with tempfile.TemporaryDirectory() as directory:
+                    created = self.extract_batch(batch, executor, directory)
+                extracted += len(created)
+                errors += sum(created)
+                self.stdout.write(
+                    "{} extracted, {} errors, last id {}".format(extracted, errors, last_id)
+                )
+
+    def extract_batch(self, bill_ids, executor, directory):
+        links = best_version_links(
+            BillVersionLink.objects.filter(version__bill_id__in=bill_ids)
+            .order_by("id")
+            .values_list("id", "version__bill_id", "url", "media_type", "version__date")
+        )
+        link_ids = [link_id for link_id, _, _ in links.values()]
+
+        # links whose text was stored by an earlier run already point at it
+        contents = dict(
+            BillVersionLink.objects.filter(id__in=link_ids, content__isnull=False).values_list(
+                "id", "content_id"
+            )
+        )
+        errors = {}
+
+        # first fetch the rest & hash the documents...
+        to_fetch = [link for link in links.values() if link[0] not in contents]
+        fetched = executor.map(
+            functools.partial(fetch_document, directory=directory, fetcher=self.fetcher),
+            [url for _, url, _ in to_fetch],
+        )
+        documents = {}
+        for (link_id, url, media_type), (digest, path, error) in zip(to_fetch, fetched):
+            if error:
+                errors[link_id] = error
+            else:
+                documents[link_id] = (digest, path, media_type)
+
+        # ...then extract only the documents that haven't been seen under another url
+        known = dict(
+            BillVersionLink.objects.filter(
+                document_sha256__in={digest for digest, _, _ in documents.values()},
+                content__isnull=False,
+            ).values_list("document_sha256", "content_id")
+        )
+        to_extract = {}
+        for digest, path, media_type in documents.values():
+            if digest not in known:
+                to_extract.setdefault(digest, (path, media_type))
+        texts = dict(zip(to_extract, executor.map(extract_file, to_extract.values())))
+        extracted = {digest: text for digest, (text, error) in texts.items() if not error}
+        known.update(zip(extracted, BillText.objects.store(list(extracted.values()))))
+
+        updated_links = []
+        for link_id, (digest, _, _) in documents.items():
+            if digest in known:
+                contents[link_id] = known[digest]
+            else:
+                errors[link_id] = texts[digest][1]
+            updated_links.append(
+                BillVersionLink(id=link_id, document_sha256=digest, content_id=known.get(digest))
+            )
+        BillVersionLink.objects.bulk_update(updated_links, ["document_sha256", "content"])
+
+        titles = defaultdict(list)
+        for bill_id, title in Bill.objects.filter(id__in=links).values_list("id", "title"):
+            titles[bill_id].append(title)
+        for bill_id, title in BillTitle.objects.filter(bill_id__in=links).values_list(
+            "bill_id", "title"
+        ):
+            titles[bill_id].append(title)
+
+        columns = ([], [], [], [], [])
+        for bill_id, (link_id, url, _) in links.items():
+            if link_id in errors:
+                self.stderr.write("{} {}: {}".format(bill_id, url, errors[link_id]))
+            row = (
+                bill_id,
+                str(link_id),
+                " ".join(titles[bill_id]),
+                contents.get(link_id),
+                link_id in errors,
+            )
+            for column, value in zip(columns, row):
+                column.append(value)
+        # the is_error flag of each SearchableBill created
+        with connection.cursor() as cursor:
+            cursor.execute(INSERT_SEARCHABLES_SQL, columns)
+            return [is_error for is_error, in cursor.fetchall()]
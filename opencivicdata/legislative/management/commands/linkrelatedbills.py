@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from ...linking import link_related_bills
+
+
+class Command(BaseCommand):
+    help = "link related bills to the bills they refer to, once those have been imported"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jurisdiction", help="only link related bills in this jurisdiction")
+        parser.add_argument(
+            "--session", help="only link related bills of bills in this legislative session id"
+        )
+
+    def handle(self, *args, **options):
+        def progress(scope, linked):
+            if linked:
+                self.stdout.write("{}: {} linked".format(scope, linked))
+
+        linked = link_related_bills(
+            jurisdiction=options["jurisdiction"],
+            legislative_session=options["session"],
+            progress=progress,
+        )
+        self.stdout.write("{} related bills linked".format(linked))
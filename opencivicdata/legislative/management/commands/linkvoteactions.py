@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from ...linking import link_vote_actions
+
+
+class Command(BaseCommand):
+    help = "link vote events to the bill actions that record them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jurisdiction", help="only link votes in this jurisdiction")
+        parser.add_argument("--session", help="only link votes in this legislative session")
+
+    def handle(self, *args, **options):
+        linked = link_vote_actions(
+            jurisdiction=options["jurisdiction"], legislative_session=options["session"]
+        )
+        self.stdout.write("{} vote events linked".format(linked))
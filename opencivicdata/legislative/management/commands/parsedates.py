@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from ...models import BillAction, Event, VoteEvent
+
+MODELS = {"billaction": BillAction, "voteevent": VoteEvent, "event": Event}
+
+
+class Command(BaseCommand):
+    help = "fill in the parsed timestamp columns of bill actions, vote events & events"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="models to update ({}), defaults to all of them".format(
+                ", ".join(sorted(MODELS))
+            ),
+        )
+        parser.add_argument(
+            "--all", action="store_true", help="reparse every row, not just unparsed ones"
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        models = options["models"] or sorted(MODELS)
+        unknown = set(models) - set(MODELS)
+        if unknown:
+            raise CommandError("unknown models: {}".format(", ".join(sorted(unknown))))
+        for model_name in models:
+            self.parse_dates(MODELS[model_name], options["all"], options["chunk_size"])
+
+    def parse_dates(self, model, everything, chunk_size):
+        fields = [field for field, _ in model.parsed_dates]
+        columns = [
+            prefix + suffix
+            for _, prefix in model.parsed_dates
+            for suffix in ("_timestamp", "_precision")
+        ]
+
+        queryset = model.objects.only("pk", *fields).order_by("pk")
+        if not everything:
+            unparsed = Q()
+            for field, prefix in model.parsed_dates:
+                unparsed |= Q(**{prefix + "_precision": ""}) & ~Q(**{field: ""})
+            queryset = queryset.filter(unparsed)
+
+        updated = 0
+        last_pk = None
+        while True:
+            chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                break
+            for obj in chunk:
+                obj.update_parsed_dates()
+            model.objects.bulk_update(chunk, columns)
+            updated += len(chunk)
+            last_pk = chunk[-1].pk
+            self.stdout.write("{}: {} updated".format(model._meta.model_name, updated))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Bill, BillStatus
+
+
+class Command(BaseCommand):
+    help = "recompute BillStatus from bill actions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--session", help="only rebuild bills in this legislative session id")
+
+    def handle(self, *args, **options):
+        if options["session"]:
+            bill_ids = Bill.objects.filter(
+                legislative_session_id=options["session"]
+            ).values_list("id", flat=True)
+            BillStatus.objects.refresh(bill_ids)
+        else:
+            BillStatus.objects.refresh()
+        self.stdout.write("{} bill statuses".format(BillStatus.objects.count()))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from ...models.bill import search_config
+from ...search import create_search_triggers, refresh_search_vectors
+
+
+class Command(BaseCommand):
+    help = "recreate the bill search triggers and recompute every search vector"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--config",
+            help="text search configuration, defaults to the OPENCIVICDATA_SEARCH_CONFIG setting",
+        )
+
+    def handle(self, *args, **options):
+        config = options["config"] or search_config()
+        with transaction.atomic(), connection.cursor() as cursor:
+            create_search_triggers(cursor, config)
+            refresh_search_vectors(cursor)
+            self.stdout.write("{} search vectors rebuilt with {}".format(cursor.rowcount, config))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from opencivicdata.core.resolvers import OrganizationNameResolver, PersonNameResolver
+from ...linking import RELATED_ENTITY_MODELS, resolve_related_entities
+
+
+class Command(BaseCommand):
+    help = "link unresolved people & organizations on sponsorships, participants, etc."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="models to resolve ({}), defaults to all of them".format(
+                ", ".join(sorted(RELATED_ENTITY_MODELS))
+            ),
+        )
+        parser.add_argument("--jurisdiction", help="only resolve entities in this jurisdiction")
+        parser.add_argument(
+            "--after", help="resume after this id, as printed by an earlier run (one model only)"
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        models = options["models"] or sorted(RELATED_ENTITY_MODELS)
+        unknown = set(models) - set(RELATED_ENTITY_MODELS)
+        if unknown:
+            raise CommandError("unknown models: {}".format(", ".join(sorted(unknown))))
+        if options["after"] and len(models) != 1:
+            raise CommandError("--after can only be used when resolving a single model")
+
+        # share the in-memory indexes between models
+        person_resolver = PersonNameResolver()
+        organization_resolver = OrganizationNameResolver()
+
+        for model_name in models:
+
+            def progress(stats):
+                self.stdout.write(
+                    "{}: {scanned} scanned, {resolved} resolved, {ambiguous} ambiguous, "
+                    "last id {last_id}".format(model_name, **stats)
+                )
+
+            resolve_related_entities(
+                model_name,
+                jurisdiction=options["jurisdiction"],
+                after=options["after"],
+                chunk_size=options["chunk_size"],
+                person_resolver=person_resolver,
+                organization_resolver=organization_resolver,
+                progress=progress,
+            )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from ...linking import resolve_voters
+
+
+class Command(BaseCommand):
+    help = "link unresolved individual votes to the people seated when the vote was held"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--session", help="only resolve votes in this legislative session")
+        parser.add_argument("--jurisdiction", help="only resolve votes in this jurisdiction")
+        parser.add_argument("--after", help="resume after this id, as printed by an earlier run")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        def progress(stats):
+            self.stdout.write(
+                "{scanned} scanned, {resolved} resolved, {ambiguous} ambiguous, "
+                "last id {last_id}".format(**stats)
+            )
+
+        resolve_voters(
+            legislative_session=options["session"],
+            jurisdiction=options["jurisdiction"],
+            after=options["after"],
+            chunk_size=options["chunk_size"],
+            progress=progress,
+        )
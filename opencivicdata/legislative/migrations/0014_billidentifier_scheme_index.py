@@ -0,0 +1,12 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("legislative", "0013_auto_20200326_0458")]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name="billidentifier", index_together={("scheme", "identifier")}
+        )
+    ]
@@ -0,0 +1,30 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # build the indexes without locking out writes to large tables
+    atomic = False
+
+    # pg_trgm is created (and dropped) by core's trigram migration
+    dependencies = [
+        ("core", "0009_trigram_indexes"),
+        ("legislative", "0014_billidentifier_scheme_index"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="bill",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["title"], name="bill_title_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="bill",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["identifier"], name="bill_identifier_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
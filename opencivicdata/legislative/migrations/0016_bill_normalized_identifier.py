@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("legislative", "0015_bill_trigram_indexes")]
+
+    operations = [
+        migrations.AddField(
+            model_name="bill",
+            name="normalized_identifier",
+            field=models.CharField(blank=True, editable=False, max_length=100, default=""),
+            preserve_default=False,
+        ),
+        # same as opencivicdata.identifiers.normalize_bill_identifier
+        migrations.RunSQL(
+            "UPDATE opencivicdata_bill SET normalized_identifier = "
+            "regexp_replace(upper(regexp_replace(identifier, '[^A-Za-z0-9]', '', 'g')), "
+            "'(^|[^0-9])0+([0-9])', '\\1\\2', 'g')",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterIndexTogether(
+            name="bill",
+            index_together={
+                ("from_organization", "legislative_session", "identifier"),
+                ("legislative_session", "normalized_identifier"),
+            },
+        ),
+    ]
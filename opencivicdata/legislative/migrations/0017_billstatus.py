@@ -0,0 +1,67 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+# same as BillStatus.objects.refresh() at the time of this migration
+POPULATE_BILL_STATUS_SQL = """
+INSERT INTO opencivicdata_billstatus (
+    bill_id, first_action_date, latest_action_date, latest_action_description,
+    introduced_date, passed_lower_date, passed_upper_date, signed_date, vetoed_date,
+    became_law_date
+)
+SELECT
+    a.bill_id,
+    COALESCE(MIN(a.date), ''),
+    COALESCE(MAX(a.date), ''),
+    COALESCE((array_agg(a.description ORDER BY a.date DESC, a."order" DESC))[1], ''),
+    COALESCE(MIN(a.date) FILTER (WHERE 'introduction' = ANY(a.classification)), ''),
+    COALESCE(MIN(a.date) FILTER (
+        WHERE 'passage' = ANY(a.classification) AND o.classification = 'lower'
+    ), ''),
+    COALESCE(MIN(a.date) FILTER (
+        WHERE 'passage' = ANY(a.classification) AND o.classification = 'upper'
+    ), ''),
+    COALESCE(MIN(a.date) FILTER (WHERE 'executive-signature' = ANY(a.classification)), ''),
+    COALESCE(MIN(a.date) FILTER (WHERE 'executive-veto' = ANY(a.classification)), ''),
+    COALESCE(MIN(a.date) FILTER (WHERE 'became-law' = ANY(a.classification)), '')
+FROM opencivicdata_billaction a
+JOIN opencivicdata_organization o ON o.id = a.organization_id
+GROUP BY a.bill_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("legislative", "0016_bill_normalized_identifier")]
+
+    operations = [
+        migrations.CreateModel(
+            name="BillStatus",
+            fields=[
+                (
+                    "bill",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="status",
+                        serialize=False,
+                        to="legislative.Bill",
+                    ),
+                ),
+                ("first_action_date", models.CharField(blank=True, max_length=25)),
+                ("latest_action_date", models.CharField(blank=True, max_length=25)),
+                ("latest_action_description", models.TextField(blank=True)),
+                ("introduced_date", models.CharField(blank=True, max_length=25)),
+                ("passed_lower_date", models.CharField(blank=True, max_length=25)),
+                ("passed_upper_date", models.CharField(blank=True, max_length=25)),
+                ("signed_date", models.CharField(blank=True, max_length=25)),
+                ("vetoed_date", models.CharField(blank=True, max_length=25)),
+                ("became_law_date", models.CharField(blank=True, max_length=25)),
+            ],
+            options={"db_table": "opencivicdata_billstatus"},
+        ),
+        migrations.AddIndex(
+            model_name="billstatus",
+            index=models.Index(fields=["latest_action_date"], name="billstatus_latest_action"),
+        ),
+        migrations.RunSQL(POPULATE_BILL_STATUS_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,92 @@
+from django.db import migrations, models
+
+DATE_PRECISION_CHOICES = [
+    ("year", "Year"),
+    ("month", "Month"),
+    ("day", "Day"),
+    ("minute", "Minute"),
+    ("second", "Second"),
+]
+
+
+class Migration(migrations.Migration):
+    """ existing rows are filled in by the parsedates management command """
+
+    dependencies = [("legislative", "0017_billstatus")]
+
+    operations = [
+        migrations.AddField(
+            model_name="billaction",
+            name="date_timestamp",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="billaction",
+            name="date_precision",
+            field=models.CharField(
+                blank=True, choices=DATE_PRECISION_CHOICES, editable=False, max_length=10
+            ),
+        ),
+        migrations.AddField(
+            model_name="voteevent",
+            name="start_timestamp",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="voteevent",
+            name="start_precision",
+            field=models.CharField(
+                blank=True, choices=DATE_PRECISION_CHOICES, editable=False, max_length=10
+            ),
+        ),
+        migrations.AddField(
+            model_name="voteevent",
+            name="end_timestamp",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="voteevent",
+            name="end_precision",
+            field=models.CharField(
+                blank=True, choices=DATE_PRECISION_CHOICES, editable=False, max_length=10
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="start_timestamp",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="start_precision",
+            field=models.CharField(
+                blank=True, choices=DATE_PRECISION_CHOICES, editable=False, max_length=10
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="end_timestamp",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="end_precision",
+            field=models.CharField(
+                blank=True, choices=DATE_PRECISION_CHOICES, editable=False, max_length=10
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="billaction",
+            index=models.Index(fields=["date_timestamp"], name="billaction_date_timestamp"),
+        ),
+        migrations.AddIndex(
+            model_name="voteevent",
+            index=models.Index(fields=["start_timestamp"], name="voteevent_start_timestamp"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["jurisdiction", "start_timestamp"], name="event_jurisdiction_start"
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # build the indexes without locking out writes to large tables
+    atomic = False
+
+    dependencies = [("legislative", "0018_parsed_timestamps")]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="bill",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["classification"], name="bill_classification_gin"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="bill",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["subject"], name="bill_subject_gin"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="billaction",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["classification"], name="billaction_classification_gin"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="voteevent",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["motion_classification"], name="voteevent_motion_class_gin"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="eventagendaitem",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["subjects"], name="agendaitem_subjects_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,117 @@
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# the SQL is inlined so this migration keeps doing what it did when it was written,
+# opencivicdata.legislative.search has the current version
+
+SEARCH_VECTOR_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION opencivicdata_bill_search_vector(
+    search_bill_id varchar, search_text text, config regconfig
+) RETURNS tsvector AS $$
+    SELECT
+        setweight(to_tsvector(config, b.identifier || ' ' || b.title), 'A') ||
+        setweight(to_tsvector(config, COALESCE(
+            (SELECT string_agg(t.title, ' ') FROM opencivicdata_billtitle t
+             WHERE t.bill_id = b.id), ''
+        )), 'B') ||
+        setweight(to_tsvector(config, COALESCE(
+            (SELECT string_agg(a.abstract, ' ') FROM opencivicdata_billabstract a
+             WHERE a.bill_id = b.id), ''
+        )), 'C') ||
+        setweight(to_tsvector(config, COALESCE(search_text, '')), 'D')
+    FROM opencivicdata_bill b
+    WHERE b.id = search_bill_id
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION opencivicdata_searchablebill_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := opencivicdata_bill_search_vector(
+        NEW.bill_id, NEW.raw_text, TG_ARGV[0]::regconfig
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+-- touching raw_text fires the trigger above
+CREATE OR REPLACE FUNCTION opencivicdata_bill_search_refresh() RETURNS trigger AS $$
+DECLARE
+    old_bill_id varchar;
+    new_bill_id varchar;
+BEGIN
+    IF TG_TABLE_NAME = 'opencivicdata_bill' THEN
+        old_bill_id := OLD.id;
+        new_bill_id := NEW.id;
+    ELSE
+        IF TG_OP <> 'INSERT' THEN
+            old_bill_id := OLD.bill_id;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            new_bill_id := NEW.bill_id;
+        END IF;
+    END IF;
+    UPDATE opencivicdata_searchablebill SET raw_text = raw_text
+    WHERE bill_id IN (old_bill_id, new_bill_id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_TRIGGERS_SQL = """
+CREATE TRIGGER searchablebill_search_vector
+    BEFORE INSERT OR UPDATE OF bill_id, raw_text ON opencivicdata_searchablebill
+    FOR EACH ROW EXECUTE PROCEDURE opencivicdata_searchablebill_vector(%s);
+CREATE TRIGGER billtitle_search_vector
+    AFTER INSERT OR UPDATE OR DELETE ON opencivicdata_billtitle
+    FOR EACH ROW EXECUTE PROCEDURE opencivicdata_bill_search_refresh();
+CREATE TRIGGER billabstract_search_vector
+    AFTER INSERT OR UPDATE OR DELETE ON opencivicdata_billabstract
+    FOR EACH ROW EXECUTE PROCEDURE opencivicdata_bill_search_refresh();
+CREATE TRIGGER bill_search_vector
+    AFTER UPDATE OF identifier, title ON opencivicdata_bill
+    FOR EACH ROW EXECUTE PROCEDURE opencivicdata_bill_search_refresh();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS searchablebill_search_vector ON opencivicdata_searchablebill;
+DROP TRIGGER IF EXISTS billtitle_search_vector ON opencivicdata_billtitle;
+DROP TRIGGER IF EXISTS billabstract_search_vector ON opencivicdata_billabstract;
+DROP TRIGGER IF EXISTS bill_search_vector ON opencivicdata_bill;
+"""
+
+DROP_FUNCTIONS_SQL = """
+DROP FUNCTION IF EXISTS opencivicdata_bill_search_refresh();
+DROP FUNCTION IF EXISTS opencivicdata_searchablebill_vector();
+DROP FUNCTION IF EXISTS opencivicdata_bill_search_vector(varchar, text, regconfig);
+"""
+
+
+def create_triggers(apps, schema_editor):
+    config = getattr(settings, "OPENCIVICDATA_SEARCH_CONFIG", "english")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(DROP_TRIGGERS_SQL)
+        cursor.execute(SEARCH_VECTOR_FUNCTION_SQL)
+        cursor.execute(CREATE_TRIGGERS_SQL, [config])
+        cursor.execute("UPDATE opencivicdata_searchablebill SET raw_text = raw_text")
+
+
+def drop_triggers(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(DROP_TRIGGERS_SQL)
+        cursor.execute(DROP_FUNCTIONS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("legislative", "0019_array_gin_indexes")]
+
+    operations = [
+        migrations.AlterField(
+            model_name="searchablebill",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                default=None, editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# the SQL is inlined so this migration keeps doing what it did when it was written,
+# opencivicdata.legislative.search has the current version
+
+# index the stored text, falling back to raw_text for rows that don't have any
+STORED_TEXT_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION opencivicdata_searchablebill_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := opencivicdata_bill_search_vector(
+        NEW.bill_id,
+        COALESCE(
+            (SELECT text FROM opencivicdata_billtext WHERE sha256 = NEW.content_id),
+            NEW.raw_text
+        ),
+        TG_ARGV[0]::regconfig
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+RAW_TEXT_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION opencivicdata_searchablebill_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := opencivicdata_bill_search_vector(
+        NEW.bill_id, NEW.raw_text, TG_ARGV[0]::regconfig
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS searchablebill_search_vector ON opencivicdata_searchablebill;
+CREATE TRIGGER searchablebill_search_vector
+    BEFORE INSERT OR UPDATE OF {columns} ON opencivicdata_searchablebill
+    FOR EACH ROW EXECUTE PROCEDURE opencivicdata_searchablebill_vector(%s);
+"""
+
+# move existing raw_text into BillText, keyed like new extractions: the sha256 of the
+# text with whitespace collapsed.  Two statements, so the trigger fired by the UPDATE
+# can see the texts inserted by the first.
+STORE_RAW_TEXT_SQL = [
+    r"""
+    INSERT INTO opencivicdata_billtext (sha256, text, created_at)
+    SELECT DISTINCT encode(sha256(convert_to(text, 'UTF8')), 'hex'), text, now()
+    FROM (
+        SELECT btrim(regexp_replace(raw_text, '\s+', ' ', 'g')) AS text
+        FROM opencivicdata_searchablebill
+        WHERE content_id IS NULL AND raw_text <> ''
+    ) texts
+    WHERE text <> ''
+    ON CONFLICT (sha256) DO NOTHING
+    """,
+    r"""
+    UPDATE opencivicdata_searchablebill
+    SET content_id = encode(
+        sha256(convert_to(btrim(regexp_replace(raw_text, '\s+', ' ', 'g')), 'UTF8')), 'hex'
+    ), raw_text = ''
+    WHERE content_id IS NULL AND btrim(regexp_replace(raw_text, '\s+', ' ', 'g')) <> ''
+    """,
+]
+
+RESTORE_RAW_TEXT_SQL = """
+UPDATE opencivicdata_searchablebill sb SET raw_text = bt.text
+FROM opencivicdata_billtext bt
+WHERE bt.sha256 = sb.content_id AND sb.raw_text = ''
+"""
+
+
+def create_trigger(function_sql, columns):
+    def create(apps, schema_editor):
+        config = getattr(settings, "OPENCIVICDATA_SEARCH_CONFIG", "english")
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(function_sql)
+            cursor.execute(CREATE_TRIGGER_SQL.format(columns=columns), [config])
+
+    return create
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("legislative", "0020_searchablebill_vector_trigger")]
+
+    operations = [
+        migrations.CreateModel(
+            name="BillText",
+            fields=[
+                (
+                    "sha256",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("text", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={"db_table": "opencivicdata_billtext"},
+        ),
+        migrations.AddField(
+            model_name="billversionlink",
+            name="content",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="version_links",
+                to="legislative.BillText",
+            ),
+        ),
+        migrations.AddField(
+            model_name="billversionlink",
+            name="document_sha256",
+            field=models.CharField(blank=True, db_index=True, default="", max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="searchablebill",
+            name="content",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="searchables",
+                to="legislative.BillText",
+            ),
+        ),
+        # index the stored text from now on...
+        migrations.RunPython(
+            create_trigger(STORED_TEXT_FUNCTION_SQL, "bill_id, content_id, raw_text"),
+            create_trigger(RAW_TEXT_FUNCTION_SQL, "bill_id, raw_text"),
+        ),
+        # ...and store the text already extracted
+        migrations.RunSQL(STORE_RAW_TEXT_SQL, RESTORE_RAW_TEXT_SQL),
+    ]
@@ -0,0 +1,146 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_trigram_indexes"),
+        ("legislative", "0021_billtext"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PersonVoteSummary",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("votes_recorded", models.PositiveIntegerField()),
+                ("votes_cast", models.PositiveIntegerField()),
+                ("party_unity", models.FloatField(null=True)),
+                ("party_unity_votes", models.PositiveIntegerField()),
+                (
+                    "legislative_session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vote_summaries",
+                        to="legislative.LegislativeSession",
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vote_summaries",
+                        to="core.Organization",
+                    ),
+                ),
+                (
+                    "party",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="core.Organization",
+                    ),
+                ),
+                (
+                    "person",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vote_summaries",
+                        to="core.Person",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "opencivicdata_personvotesummary",
+                "unique_together": {("legislative_session", "organization", "person")},
+            },
+        ),
+        migrations.CreateModel(
+            name="PersonVoteAgreement",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("agreement", models.FloatField()),
+                ("shared_votes", models.PositiveIntegerField()),
+                (
+                    "legislative_session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="legislative.LegislativeSession",
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.Organization",
+                    ),
+                ),
+                (
+                    "other_person",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.Person",
+                    ),
+                ),
+                (
+                    "person",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vote_agreements",
+                        to="core.Person",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "opencivicdata_personvoteagreement",
+                "index_together": {("legislative_session", "organization", "person")},
+            },
+        ),
+        migrations.CreateModel(
+            name="VoteEventCohesion",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("yes_count", models.PositiveIntegerField()),
+                ("no_count", models.PositiveIntegerField()),
+                ("rice_index", models.FloatField()),
+                (
+                    "party",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.Organization",
+                    ),
+                ),
+                (
+                    "vote_event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cohesion",
+                        to="legislative.VoteEvent",
+                    ),
+                ),
+            ],
+            options={"db_table": "opencivicdata_voteeventcohesion"},
+        ),
+    ]
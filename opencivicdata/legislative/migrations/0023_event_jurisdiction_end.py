@@ -0,0 +1,19 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # build the index without locking out writes to large tables
+    atomic = False
+
+    dependencies = [("legislative", "0022_vote_summaries")]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="event",
+            index=models.Index(
+                fields=["jurisdiction", "end_timestamp"], name="event_jurisdiction_end"
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# zero padding is now stripped per group of digits and adjacent groups of digits are kept
+# apart with "-", as in opencivicdata.identifiers.normalize_bill_identifier
+NORMALIZED_IDENTIFIER_SQL = (
+    "upper(replace(regexp_replace(regexp_replace("
+    "regexp_replace(identifier, '(^|[^0-9])0+([0-9])', '\\1\\2', 'g'), "
+    "'[^A-Za-z0-9]+', ' ', 'g'), '([0-9]) (?=[0-9])', '\\1-', 'g'), ' ', ''))"
+)
+PREVIOUS_NORMALIZED_IDENTIFIER_SQL = (
+    "regexp_replace(upper(regexp_replace(identifier, '[^A-Za-z0-9]', '', 'g')), "
+    "'(^|[^0-9])0+([0-9])', '\\1\\2', 'g')"
+)
+
+
+def renormalize(sql):
+    return (
+        "UPDATE opencivicdata_bill SET normalized_identifier = {0} "
+        "WHERE normalized_identifier IS DISTINCT FROM {0}".format(sql)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("legislative", "0023_event_jurisdiction_end")]
+
+    operations = [
+        migrations.RunSQL(
+            renormalize(NORMALIZED_IDENTIFIER_SQL),
+            renormalize(PREVIOUS_NORMALIZED_IDENTIFIER_SQL),
+        )
+    ]
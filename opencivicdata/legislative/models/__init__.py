@@ -11,12 +11,22 @@ from .bill import (
     BillVersion,
     BillDocumentLink,
     BillVersionLink,
+    BillText,
     BillSource,
     BillActionRelatedEntity,
     BillAction,
+    BillStatus,
     SearchableBill,
 )
-from .vote import VoteEvent, VoteCount, PersonVote, VoteSource
+from .vote import (
+    VoteEvent,
+    VoteCount,
+    PersonVote,
+    VoteSource,
+    PersonVoteSummary,
+    PersonVoteAgreement,
+    VoteEventCohesion,
+)
 from .event import (
     Event,
     EventLocation,
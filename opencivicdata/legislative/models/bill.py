@@ -1,8 +1,21 @@
 from __future__ import unicode_literals
-from django.db import models
-from django.db.models import JSONField
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import connection, models, transaction
+from django.db.models import Exists, F, JSONField, OuterRef, Q
+from django.db.models.signals import post_delete, post_save
+from django.db.models.functions import Coalesce
 from django.contrib.postgres.fields import ArrayField
-from django.contrib.postgres.search import SearchVectorField
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+)
 from django.contrib.postgres.indexes import GinIndex
 
 
@@ -14,13 +27,205 @@ from opencivicdata.core.models.base import (
     RelatedEntityBase,
     MimetypeLinkBase,
     IdentifierBase,
+    IdentifierQuerySet,
+    ParsedDateMixin,
+    ParsedDateQuerySet,
+    array_match,
+    trigram_search,
 )
-from opencivicdata.core.models import Organization
+from opencivicdata.core.models import Membership, Organization
 from .session import LegislativeSession
 from ... import common
+from ..extraction import text_sha256
+from ...identifiers import normalize_bill_identifier
+
+
+# the rows each facet contributes for the bills (b) being counted, as (facet, value, bill)
+BILL_FACET_SQL = {
+    "subject": "SELECT 'subject', unnest(b.subject), b.id FROM bills b",
+    "classification": "SELECT 'classification', unnest(b.classification), b.id FROM bills b",
+    "session": """
+        SELECT 'session', ls.identifier, b.id FROM bills b
+        JOIN opencivicdata_legislativesession ls ON ls.id = b.legislative_session_id
+    """,
+    # parties the sponsor belonged to at some point during the bill's session, or at any
+    # time if the session's dates are unknown
+    "sponsor_party": """
+        SELECT 'sponsor_party', party.name, b.id FROM bills b
+        JOIN opencivicdata_legislativesession ls ON ls.id = b.legislative_session_id
+        JOIN opencivicdata_billsponsorship s ON s.bill_id = b.id
+        JOIN opencivicdata_membership m ON m.person_id = s.person_id
+            AND m.date_range && COALESCE(
+                NULLIF(opencivicdata_partial_date_range(ls.start_date, ls.end_date), 'empty'),
+                '(,)'
+            )
+        JOIN opencivicdata_organization party
+            ON party.id = m.organization_id AND party.classification = 'party'
+    """,
+}
+
+BILL_FACETS_SQL = """
+WITH bills AS ({bills})
+SELECT facet, value, COUNT(DISTINCT bill_id) FROM ({facets}) AS facets (facet, value, bill_id)
+GROUP BY facet, value
+"""
+
+BILL_FACETS_VERSION_KEY = "opencivicdata:bill-facets:version"
+
+
+def bill_facets_version():
+    """ the token that cached facet counts are keyed by, see invalidate_bill_facets """
+    return cache.get_or_set(BILL_FACETS_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def invalidate_bill_facets(*args, **kwargs):
+    """
+    Make every cached Bill.objects.facets() result stale.
+
+    Called whenever bills, their sponsorships, memberships or organizations are saved or
+    deleted one at a time, and by Bill.objects.bulk_create.  Call it after changing them
+    in other ways, such as queryset.update() or bulk_update().
+    """
+    cache.set(BILL_FACETS_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+class BillQuerySet(IdentifierQuerySet):
+    identifier_relation = "other_identifiers"
+
+    def title_search(self, text, threshold=None):
+        """ bills with titles containing words similar to ``text``, best matches first """
+        return trigram_search(self, "title", text, threshold, word=True)
+
+    def lookup(self, legislative_session, identifier):
+        """
+        Bills in a session matching ``identifier`` in any of its spellings,
+        e.g. "HB 1", "H.B. 1", "HB0001" or "hb1".
+        """
+        return self.filter(
+            legislative_session_id=getattr(legislative_session, "pk", legislative_session),
+            normalized_identifier=normalize_bill_identifier(identifier),
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.normalized_identifier = normalize_bill_identifier(obj.identifier)
+        objs = super(BillQuerySet, self).bulk_create(objs, *args, **kwargs)
+        invalidate_bill_facets()
+        return objs
+
+    def identifier_search(self, identifier, threshold=None):
+        """ bills with identifiers similar to ``identifier``, best matches first """
+        return trigram_search(self, "identifier", identifier, threshold)
+
+    def facets(
+        self,
+        fields=("subject", "classification", "sponsor_party", "session"),
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        """
+        Count the bills in this queryset by each of ``fields``, all in a single query.
+
+        Returns a dict of field to a list of (value, count) pairs, largest count first.
+        Fields are "subject", "classification", "session" (by identifier) and
+        "sponsor_party", the parties of sponsors that have been resolved to people.
+
+        Results are cached for ``timeout`` seconds under a key made from the queryset's
+        SQL and a version token that invalidate_bill_facets replaces whenever bills,
+        sponsorships, memberships or organizations are saved or deleted, so building the
+        key takes no queries.  Changes made in bulk without calling invalidate_bill_facets
+        (such as queryset.update()) aren't noticed until the entry expires.
+        """
+        fields = list(fields)
+        unknown = set(fields) - set(BILL_FACET_SQL)
+        if unknown:
+            raise ValueError("unknown facets: {}".format(", ".join(sorted(unknown))))
+
+        bills = self.order_by().values("id", "subject", "classification", "legislative_session")
+        bills_sql, params = bills.query.sql_with_params()
+
+        key = hashlib.sha1(
+            repr((bills_sql, params, fields, bill_facets_version())).encode()
+        ).hexdigest()
+        key = "opencivicdata:bill-facets:" + key
+
+        facets = cache.get(key)
+        if facets is None:
+            facets = {field: [] for field in fields}
+            sql = BILL_FACETS_SQL.format(
+                bills=bills_sql,
+                facets=" UNION ALL ".join(BILL_FACET_SQL[field] for field in fields),
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                for field, value, count in cursor.fetchall():
+                    facets[field].append((value, count))
+            for counts in facets.values():
+                counts.sort(key=lambda pair: (-pair[1], pair[0] or ""))
+            cache.set(key, facets, timeout)
+        return facets
+
+    def search(
+        self, text, jurisdiction=None, session=None, limit=20, after=None, headline=False
+    ):
+        """
+        Full text search of bills' titles & text, best matches first.
+
+        ``text`` is parsed as by web search engines (quoted phrases, "or", -excluded).
+        Matching goes through the GIN index on SearchableBill.search_vector and only the
+        matches, narrowed down by ``jurisdiction`` and ``session``, are ranked.  Results
+        are annotated with their ``rank``, and a ``headline`` snippet of the text with
+        the matches highlighted if requested.
+
+        To get the next page pass ``after=(bill.rank, bill.id)`` of the last result.
+        """
+        config = search_config()
+        query = SearchQuery(text, config=config, search_type="websearch")
+        bills = self.filter(searchable__search_vector=query)
+        if jurisdiction:
+            bills = bills.filter(
+                legislative_session__jurisdiction_id=getattr(jurisdiction, "pk", jurisdiction)
+            )
+        if session:
+            bills = bills.filter(legislative_session_id=getattr(session, "pk", session))
+
+        bills = bills.annotate(rank=SearchRank(F("searchable__search_vector"), query))
+        if after:
+            rank, bill_id = after
+            bills = bills.filter(Q(rank__lt=rank) | Q(rank=rank, id__gt=bill_id))
+        if headline:
+            bills = bills.annotate(
+                headline=SearchHeadline(
+                    Coalesce("searchable__content__text", "searchable__raw_text"),
+                    query,
+                    config=config,
+                )
+            )
+        return bills.order_by("-rank", "id")[:limit]
+
+    def with_subject(self, subjects, match_all=False):
+        """ bills with any (or every) one of ``subjects`` """
+        return self.filter(array_match("subject", subjects, match_all))
+
+    def with_classification(self, classifications, match_all=False):
+        """ bills with any (or every) one of ``classifications`` """
+        return self.filter(array_match("classification", classifications, match_all))
+
+    def with_action_classification(self, classifications, match_all=False):
+        """ bills with an action classified as any (or every) one of ``classifications`` """
+        return self.filter(
+            Exists(
+                BillAction.objects.filter(
+                    array_match("classification", classifications, match_all),
+                    bill_id=OuterRef("pk"),
+                )
+            )
+        )
 
 
 class Bill(OCDBase):
+    objects = BillQuerySet.as_manager()
+
     id = OCDIDField(ocd_type="bill")
     legislative_session = models.ForeignKey(
         LegislativeSession,
@@ -29,6 +234,8 @@ class Bill(OCDBase):
         on_delete=models.PROTECT,
     )
     identifier = models.CharField(max_length=100)
+    # identifier without case, punctuation or zero padding, maintained automatically
+    normalized_identifier = models.CharField(max_length=100, blank=True, editable=False)
 
     title = models.TextField()
 
@@ -46,9 +253,35 @@ class Bill(OCDBase):
     def __str__(self):
         return "{} in {}".format(self.identifier, self.legislative_session)
 
+    def save(self, *args, **kwargs):
+        self.normalized_identifier = normalize_bill_identifier(self.identifier)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "identifier" in update_fields:
+            kwargs["update_fields"] = list(update_fields) + ["normalized_identifier"]
+        super(Bill, self).save(*args, **kwargs)
+        invalidate_bill_facets()
+
+    def delete(self, *args, **kwargs):
+        deleted = super(Bill, self).delete(*args, **kwargs)
+        invalidate_bill_facets()
+        return deleted
+
     class Meta:
         db_table = "opencivicdata_bill"
-        index_together = [["from_organization", "legislative_session", "identifier"]]
+        index_together = [
+            ["from_organization", "legislative_session", "identifier"],
+            ["legislative_session", "normalized_identifier"],
+        ]
+        indexes = [
+            GinIndex(name="bill_title_trgm", fields=["title"], opclasses=["gin_trgm_ops"]),
+            GinIndex(
+                name="bill_identifier_trgm",
+                fields=["identifier"],
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(name="bill_classification_gin", fields=["classification"]),
+            GinIndex(name="bill_subject_gin", fields=["subject"]),
+        ]
 
 
 class BillAbstract(RelatedBase):
@@ -84,11 +317,33 @@ class BillIdentifier(IdentifierBase):
     )
     note = models.TextField(blank=True)
 
-    class Meta:
+    class Meta(IdentifierBase.Meta):
         db_table = "opencivicdata_billidentifier"
 
 
-class BillAction(RelatedBase):
+class BillActionQuerySet(ParsedDateQuerySet):
+    """ keeps BillStatus up to date when actions are created or deleted in bulk """
+
+    def with_classification(self, classifications, match_all=False):
+        """ actions classified as any (or every) one of ``classifications`` """
+        return self.filter(array_match("classification", classifications, match_all))
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super(BillActionQuerySet, self).bulk_create(objs, *args, **kwargs)
+        BillStatus.objects.refresh({obj.bill_id for obj in objs})
+        return objs
+
+    def delete(self):
+        bill_ids = set(self.values_list("bill_id", flat=True))
+        deleted = super(BillActionQuerySet, self).delete()
+        BillStatus.objects.refresh(bill_ids)
+        return deleted
+
+
+class BillAction(ParsedDateMixin, RelatedBase):
+    objects = BillActionQuerySet.as_manager()
+    parsed_dates = (("date", "date"),)
+
     bill = models.ForeignKey(Bill, related_name="actions", on_delete=models.CASCADE)
     organization = models.ForeignKey(
         Organization,
@@ -98,6 +353,11 @@ class BillAction(RelatedBase):
     )
     description = models.TextField()
     date = models.CharField(max_length=25)  # YYYY-MM-DD HH:MM:SS+HH:MM
+    # parsed from date, maintained automatically
+    date_timestamp = models.DateTimeField(null=True, editable=False)
+    date_precision = models.CharField(
+        max_length=10, blank=True, editable=False, choices=common.DATE_PRECISION_CHOICES
+    )
     classification = ArrayField(
         base_field=models.TextField(), blank=True, default=list
     )  # enum
@@ -107,10 +367,129 @@ class BillAction(RelatedBase):
     class Meta:
         db_table = "opencivicdata_billaction"
         ordering = ["order"]
+        indexes = [
+            models.Index(name="billaction_date_timestamp", fields=["date_timestamp"]),
+            GinIndex(name="billaction_classification_gin", fields=["classification"]),
+        ]
 
     def __str__(self):
         return "{0} action on {1}".format(self.bill.identifier, self.date)
 
+    def save(self, *args, **kwargs):
+        super(BillAction, self).save(*args, **kwargs)
+        BillStatus.objects.refresh([self.bill_id])
+
+    def delete(self, *args, **kwargs):
+        bill_id = self.bill_id
+        deleted = super(BillAction, self).delete(*args, **kwargs)
+        BillStatus.objects.refresh([bill_id])
+        return deleted
+
+
+# milestone columns of BillStatus and the aggregate over a bill's actions (a) and their
+# organizations (o) that fills each one in
+BILL_STATUS_COLUMNS = (
+    ("first_action_date", "MIN(a.date)"),
+    ("latest_action_date", "MAX(a.date)"),
+    (
+        "latest_action_description",
+        '(array_agg(a.description ORDER BY a.date DESC, a."order" DESC))[1]',
+    ),
+    ("introduced_date", "MIN(a.date) FILTER (WHERE 'introduction' = ANY(a.classification))"),
+    (
+        "passed_lower_date",
+        "MIN(a.date) FILTER (WHERE 'passage' = ANY(a.classification) "
+        "AND o.classification = 'lower')",
+    ),
+    (
+        "passed_upper_date",
+        "MIN(a.date) FILTER (WHERE 'passage' = ANY(a.classification) "
+        "AND o.classification = 'upper')",
+    ),
+    ("signed_date", "MIN(a.date) FILTER (WHERE 'executive-signature' = ANY(a.classification))"),
+    ("vetoed_date", "MIN(a.date) FILTER (WHERE 'executive-veto' = ANY(a.classification))"),
+    ("became_law_date", "MIN(a.date) FILTER (WHERE 'became-law' = ANY(a.classification))"),
+)
+
+BILL_STATUS_DELETE_SQL = """
+DELETE FROM opencivicdata_billstatus s
+WHERE {where} AND NOT EXISTS (
+    SELECT 1 FROM opencivicdata_billaction a WHERE a.bill_id = s.bill_id
+)
+"""
+
+BILL_STATUS_UPSERT_SQL = """
+INSERT INTO opencivicdata_billstatus (bill_id, {columns})
+SELECT a.bill_id, {aggregates}
+FROM opencivicdata_billaction a
+JOIN opencivicdata_organization o ON o.id = a.organization_id
+WHERE {where}
+GROUP BY a.bill_id
+ON CONFLICT (bill_id) DO UPDATE SET {updates}
+""".format(
+    columns=", ".join(column for column, _ in BILL_STATUS_COLUMNS),
+    aggregates=", ".join(
+        "COALESCE({}, '')".format(aggregate) for _, aggregate in BILL_STATUS_COLUMNS
+    ),
+    updates=", ".join(
+        "{0} = EXCLUDED.{0}".format(column) for column, _ in BILL_STATUS_COLUMNS
+    ),
+    where="{where}",
+)
+
+
+class BillStatusQuerySet(models.QuerySet):
+    def refresh(self, bill_ids=None):
+        """
+        Recompute the status of the given bills from their actions, or of every bill.
+        """
+        if bill_ids is None:
+            params = []
+            where = "TRUE"
+        else:
+            params = [list(bill_ids)]
+            if not params[0]:
+                return
+            where = "{}.bill_id = ANY(%s)"
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(BILL_STATUS_DELETE_SQL.format(where=where.format("s")), params)
+            cursor.execute(BILL_STATUS_UPSERT_SQL.format(where=where.format("a")), params)
+
+
+class BillStatus(models.Model):
+    """
+    A bill's milestones, derived from its actions so that listings don't have to
+    aggregate them.
+
+    Rows are refreshed whenever actions are saved or deleted through the ORM, other
+    changes (e.g. raw SQL, or reclassifying a chamber) need a rebuild with the
+    rebuildbillstatus command.  Dates are in the same format as BillAction.date and
+    blank when the milestone hasn't been reached.
+    """
+
+    objects = BillStatusQuerySet.as_manager()
+
+    bill = models.OneToOneField(
+        Bill, primary_key=True, related_name="status", on_delete=models.CASCADE
+    )
+    first_action_date = models.CharField(max_length=25, blank=True)
+    latest_action_date = models.CharField(max_length=25, blank=True)
+    latest_action_description = models.TextField(blank=True)
+    introduced_date = models.CharField(max_length=25, blank=True)
+    passed_lower_date = models.CharField(max_length=25, blank=True)
+    passed_upper_date = models.CharField(max_length=25, blank=True)
+    signed_date = models.CharField(max_length=25, blank=True)
+    vetoed_date = models.CharField(max_length=25, blank=True)
+    became_law_date = models.CharField(max_length=25, blank=True)
+
+    def __str__(self):
+        return "status of {}".format(self.bill)
+
+    class Meta:
+        db_table = "opencivicdata_billstatus"
+        indexes = [models.Index(name="billstatus_latest_action", fields=["latest_action_date"])]
+
 
 class BillActionRelatedEntity(RelatedEntityBase):
     action = models.ForeignKey(
@@ -166,6 +545,15 @@ class BillSponsorship(RelatedEntityBase):
     class Meta:
         db_table = "opencivicdata_billsponsorship"
 
+    def save(self, *args, **kwargs):
+        super(BillSponsorship, self).save(*args, **kwargs)
+        invalidate_bill_facets()
+
+    def delete(self, *args, **kwargs):
+        deleted = super(BillSponsorship, self).delete(*args, **kwargs)
+        invalidate_bill_facets()
+        return deleted
+
 
 class BillDocument(RelatedBase):
     bill = models.ForeignKey(Bill, related_name="documents", on_delete=models.CASCADE)
@@ -205,10 +593,47 @@ class BillDocumentLink(MimetypeLinkBase):
         db_table = "opencivicdata_billdocumentlink"
 
 
+class BillTextQuerySet(models.QuerySet):
+    def store(self, texts):
+        """ save any of ``texts`` not stored yet, returning their hashes in order """
+        stored = {text_sha256(text): text for text in texts}
+        self.bulk_create(
+            [BillText(sha256=sha256, text=text) for sha256, text in stored.items()],
+            ignore_conflicts=True,
+        )
+        return [text_sha256(text) for text in texts]
+
+
+class BillText(models.Model):
+    """
+    Text extracted from a bill version document, stored once however many links share it.
+
+    Texts are keyed by the sha256 of their normalized form (see ..extraction), large
+    values are compressed by PostgreSQL as they're TOASTed.
+    """
+
+    objects = BillTextQuerySet.as_manager()
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+    class Meta:
+        db_table = "opencivicdata_billtext"
+
+
 class BillVersionLink(MimetypeLinkBase):
     version = models.ForeignKey(
         BillVersion, related_name="links", on_delete=models.CASCADE
     )
+    # the text extracted from the document, and the sha256 of the document it came from
+    content = models.ForeignKey(
+        BillText, related_name="version_links", null=True, on_delete=models.SET_NULL
+    )
+    document_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
 
     def __str__(self):
         return "{0} for {1}".format(self.url, self.version)
@@ -224,6 +649,11 @@ class BillSource(LinkBase):
         db_table = "opencivicdata_billsource"
 
 
+def search_config():
+    """ the text search configuration bills are indexed with """
+    return getattr(settings, "OPENCIVICDATA_SEARCH_CONFIG", "english")
+
+
 class SearchableBill(models.Model):
     """
     This model associates a single version's text with a given bill.
@@ -242,8 +672,13 @@ class SearchableBill(models.Model):
         BillVersionLink, related_name="searchable", null=True, on_delete=models.CASCADE
     )
 
-    search_vector = SearchVectorField(default=None)
+    # weighted titles, abstracts & text, maintained by a trigger (see ..search)
+    search_vector = SearchVectorField(default=None, null=True, editable=False)
     all_titles = models.TextField(default="")
+    # the extracted text, raw_text is only used by rows from before BillText existed
+    content = models.ForeignKey(
+        BillText, related_name="searchables", null=True, on_delete=models.SET_NULL
+    )
     raw_text = models.TextField(default="")
     is_error = models.BooleanField(default=False)
 
@@ -252,3 +687,10 @@ class SearchableBill(models.Model):
     class Meta:
         db_table = "opencivicdata_searchablebill"
         indexes = [GinIndex(name="search_index", fields=["search_vector"])]
+
+
+# party memberships & names are core models, so they are followed with signals
+post_save.connect(invalidate_bill_facets, sender=Membership)
+post_delete.connect(invalidate_bill_facets, sender=Membership)
+post_save.connect(invalidate_bill_facets, sender=Organization)
+post_delete.connect(invalidate_bill_facets, sender=Organization)
@@ -1,6 +1,9 @@
+import datetime
+
 from django.contrib.gis.db import models
 from django.db.models import JSONField
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from opencivicdata.core.models.base import (
     OCDBase,
     LinkBase,
@@ -8,15 +11,26 @@ from opencivicdata.core.models.base import (
     RelatedBase,
     RelatedEntityBase,
     MimetypeLinkBase,
+    ParsedDateMixin,
+    ParsedDateQuerySet,
+    array_match,
+    timestamp_bound,
 )
 from opencivicdata.core.models import Jurisdiction
 from .bill import Bill
 from .vote import VoteEvent
+from ...dates import PARTIAL_DATE_RE, TIME_RE, partial_date_bounds
 from ...common import (
+    DATE_PRECISION_CHOICES,
     EVENT_MEDIA_CLASSIFICATION_CHOICES,
     EVENT_DOCUMENT_CLASSIFICATION_CHOICES,
 )
 
+try:
+    import zoneinfo
+except ImportError:
+    from backports import zoneinfo
+
 EVENT_STATUS_CHOICES = (
     ("cancelled", "Cancelled"),
     ("tentative", "Tentative"),
@@ -49,7 +63,70 @@ class EventLocation(RelatedBase):
         db_table = "opencivicdata_eventlocation"
 
 
-class Event(OCDBase):
+def _window_bound(value, tz, end=False):
+    """
+    A calendar window bound as an aware datetime, dates (or date strings without a time)
+    start at midnight in ``tz`` and an end date includes that whole day.
+    """
+    if isinstance(value, str):
+        match = PARTIAL_DATE_RE.match(value)
+        time = TIME_RE.match(value[match.end():]) if match else None
+        if match and not value[match.end():].strip():
+            first, last = partial_date_bounds(value)
+            value = last if end else first
+        elif time and not time.group(5):
+            # a local time without an offset
+            value = timestamp_bound(value).replace(tzinfo=tz)
+    if end and isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value += datetime.timedelta(days=1)
+    return timestamp_bound(value, tz)
+
+
+class EventQuerySet(ParsedDateQuerySet):
+    def in_window(self, jurisdiction, start, end, tz=None):
+        """
+        A jurisdiction's events taking place from ``start`` through ``end``, in start order.
+
+        Events that start in the window are included, as are those that started earlier
+        and haven't ended by its start.  Bounds are dates, datetimes or date strings;
+        dates, naive datetimes and strings without an offset are in ``tz``, a tzinfo or
+        time zone name (by default UTC), and an end date includes that whole day.
+        Answered from the (jurisdiction, start_timestamp) & (jurisdiction, end_timestamp)
+        indexes.
+        """
+        if isinstance(tz, str):
+            tz = zoneinfo.ZoneInfo(tz)
+        tz = tz or datetime.timezone.utc
+        start, end = _window_bound(start, tz), _window_bound(end, tz, end=True)
+        return (
+            self.filter(jurisdiction_id=getattr(jurisdiction, "pk", jurisdiction))
+            .filter(
+                models.Q(start_timestamp__gte=start, start_timestamp__lt=end)
+                | models.Q(end_timestamp__gte=start, start_timestamp__lt=start)
+            )
+            .order_by("start_timestamp", "id")
+        )
+
+    def with_details(self):
+        """
+        Load each event's location, participants, agenda, media & documents up front, in
+        a fixed number of queries however many events there are.
+        """
+        return self.select_related("location").prefetch_related(
+            "participants",
+            "agenda__related_entities",
+            "agenda__media__links",
+            "media__links",
+            "documents__links",
+            "links",
+            "sources",
+        )
+
+
+class Event(ParsedDateMixin, OCDBase):
+    objects = EventQuerySet.as_manager()
+    parsed_dates = (("start_date", "start"), ("end_date", "end"))
+
     id = OCDIDField(ocd_type="event")
     name = models.CharField(max_length=1000)
     jurisdiction = models.ForeignKey(
@@ -62,6 +139,16 @@ class Event(OCDBase):
     classification = models.CharField(max_length=100)
     start_date = models.CharField(max_length=25)  # YYYY-MM-DD HH:MM:SS+HH:MM
     end_date = models.CharField(max_length=25, blank=True)  # YYYY-MM-DD HH:MM:SS+HH:MM
+    # parsed from start_date, maintained automatically
+    start_timestamp = models.DateTimeField(null=True, editable=False)
+    start_precision = models.CharField(
+        max_length=10, blank=True, editable=False, choices=DATE_PRECISION_CHOICES
+    )
+    # parsed from end_date, maintained automatically
+    end_timestamp = models.DateTimeField(null=True, editable=False)
+    end_precision = models.CharField(
+        max_length=10, blank=True, editable=False, choices=DATE_PRECISION_CHOICES
+    )
     all_day = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=EVENT_STATUS_CHOICES)
     location = models.ForeignKey(EventLocation, null=True, on_delete=models.SET_NULL)
@@ -72,6 +159,12 @@ class Event(OCDBase):
     class Meta:
         db_table = "opencivicdata_event"
         index_together = [["jurisdiction", "start_date", "name"]]
+        indexes = [
+            models.Index(
+                name="event_jurisdiction_start", fields=["jurisdiction", "start_timestamp"]
+            ),
+            models.Index(name="event_jurisdiction_end", fields=["jurisdiction", "end_timestamp"]),
+        ]
 
 
 class EventMedia(EventMediaBase):
@@ -155,7 +248,15 @@ class EventParticipant(RelatedEntityBase):
         db_table = "opencivicdata_eventparticipant"
 
 
+class EventAgendaItemQuerySet(models.QuerySet):
+    def with_subject(self, subjects, match_all=False):
+        """ agenda items with any (or every) one of ``subjects`` """
+        return self.filter(array_match("subjects", subjects, match_all))
+
+
 class EventAgendaItem(RelatedBase):
+    objects = EventAgendaItemQuerySet.as_manager()
+
     description = models.TextField()
     classification = ArrayField(base_field=models.TextField(), blank=True, default=list)
     order = models.CharField(max_length=100, blank=True)
@@ -171,6 +272,7 @@ class EventAgendaItem(RelatedBase):
 
     class Meta:
         db_table = "opencivicdata_eventagendaitem"
+        indexes = [GinIndex(name="agendaitem_subjects_gin", fields=["subjects"])]
 
 
 class EventRelatedEntity(RelatedEntityBase):
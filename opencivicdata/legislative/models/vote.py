@@ -1,15 +1,33 @@
 from django.db import models
 from django.db.models import JSONField
 from django.contrib.postgres.fields import ArrayField
-
-from opencivicdata.core.models.base import OCDBase, LinkBase, OCDIDField, RelatedBase
+from django.contrib.postgres.indexes import GinIndex
+
+from opencivicdata.core.models.base import (
+    OCDBase,
+    LinkBase,
+    OCDIDField,
+    RelatedBase,
+    ParsedDateMixin,
+    ParsedDateQuerySet,
+    array_match,
+)
 from opencivicdata.core.models import Organization, Person
 from .session import LegislativeSession
 from .bill import Bill, BillAction
 from ... import common
 
 
-class VoteEvent(OCDBase):
+class VoteEventQuerySet(ParsedDateQuerySet):
+    def with_motion_classification(self, classifications, match_all=False):
+        """ votes on motions classified as any (or every) one of ``classifications`` """
+        return self.filter(array_match("motion_classification", classifications, match_all))
+
+
+class VoteEvent(ParsedDateMixin, OCDBase):
+    objects = VoteEventQuerySet.as_manager()
+    parsed_dates = (("start_date", "start"), ("end_date", "end"))
+
     id = OCDIDField(ocd_type="vote")
     identifier = models.CharField(max_length=300, blank=True)
     motion_text = models.TextField()
@@ -19,6 +37,16 @@ class VoteEvent(OCDBase):
     )
     start_date = models.CharField(max_length=25)  # YYYY-MM-DD HH:MM:SS+HH:MM
     end_date = models.CharField(max_length=25, blank=True)  # YYYY-MM-DD HH:MM:SS+HH:MM
+    # parsed from start_date, maintained automatically
+    start_timestamp = models.DateTimeField(null=True, editable=False)
+    start_precision = models.CharField(
+        max_length=10, blank=True, editable=False, choices=common.DATE_PRECISION_CHOICES
+    )
+    # parsed from end_date, maintained automatically
+    end_timestamp = models.DateTimeField(null=True, editable=False)
+    end_precision = models.CharField(
+        max_length=10, blank=True, editable=False, choices=common.DATE_PRECISION_CHOICES
+    )
 
     result = models.CharField(max_length=50, choices=common.VOTE_RESULT_CHOICES)
     organization = models.ForeignKey(
@@ -63,6 +91,10 @@ class VoteEvent(OCDBase):
             ["legislative_session", "identifier", "bill"],
             ["legislative_session", "bill"],
         ]
+        indexes = [
+            models.Index(name="voteevent_start_timestamp", fields=["start_timestamp"]),
+            GinIndex(name="voteevent_motion_class_gin", fields=["motion_classification"]),
+        ]
 
 
 class VoteCount(RelatedBase):
@@ -108,3 +140,80 @@ class VoteSource(LinkBase):
 
     class Meta:
         db_table = "opencivicdata_votesource"
+
+
+class PersonVoteSummary(models.Model):
+    """
+    A person's voting record in an organization during a session, see ..analytics.
+    """
+
+    legislative_session = models.ForeignKey(
+        LegislativeSession, related_name="vote_summaries", on_delete=models.CASCADE
+    )
+    organization = models.ForeignKey(
+        Organization, related_name="vote_summaries", on_delete=models.CASCADE
+    )
+    person = models.ForeignKey(Person, related_name="vote_summaries", on_delete=models.CASCADE)
+    party = models.ForeignKey(
+        Organization, related_name="+", null=True, on_delete=models.SET_NULL
+    )
+    votes_recorded = models.PositiveIntegerField()
+    # yes & no votes
+    votes_cast = models.PositiveIntegerField()
+    # fraction of party unity votes the person voted with their party's majority on
+    party_unity = models.FloatField(null=True)
+    party_unity_votes = models.PositiveIntegerField()
+
+    def __str__(self):
+        return "{} in {}".format(self.person, self.legislative_session)
+
+    class Meta:
+        db_table = "opencivicdata_personvotesummary"
+        unique_together = [["legislative_session", "organization", "person"]]
+
+
+class PersonVoteAgreement(models.Model):
+    """
+    How often two people voted the same way in an organization during a session.
+    """
+
+    legislative_session = models.ForeignKey(
+        LegislativeSession, related_name="+", on_delete=models.CASCADE
+    )
+    organization = models.ForeignKey(Organization, related_name="+", on_delete=models.CASCADE)
+    person = models.ForeignKey(
+        Person, related_name="vote_agreements", on_delete=models.CASCADE
+    )
+    other_person = models.ForeignKey(Person, related_name="+", on_delete=models.CASCADE)
+    # fraction of the votes both cast a yes or no on where they voted the same way
+    agreement = models.FloatField()
+    shared_votes = models.PositiveIntegerField()
+
+    def __str__(self):
+        return "{} & {} agreement".format(self.person, self.other_person)
+
+    class Meta:
+        db_table = "opencivicdata_personvoteagreement"
+        index_together = [["legislative_session", "organization", "person"]]
+
+
+class VoteEventCohesion(models.Model):
+    """
+    Rice index of cohesion of a vote, for the whole organization (party null) or a party.
+    """
+
+    vote_event = models.ForeignKey(
+        VoteEvent, related_name="cohesion", on_delete=models.CASCADE
+    )
+    party = models.ForeignKey(
+        Organization, related_name="+", null=True, on_delete=models.CASCADE
+    )
+    yes_count = models.PositiveIntegerField()
+    no_count = models.PositiveIntegerField()
+    rice_index = models.FloatField()
+
+    def __str__(self):
+        return "cohesion of {}".format(self.vote_event)
+
+    class Meta:
+        db_table = "opencivicdata_voteeventcohesion"
@@ -0,0 +1,156 @@
+"""
+Roll-call matrices: how every legislator voted on every vote of a session, as one array.
+
+Needs numpy, install with ``pip install ccdc-opencivicdata[analytics]``.
+
+    matrix = VoteMatrix.for_session(session, organization=house)
+    matrix.save("house-2017.npz")
+    matrix = VoteMatrix.load("house-2017.npz")
+    matrix.matrix[matrix.person_index(person_id)] == matrix.code("yes")
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .. import common
+
+# how a person voted on a vote: 0 if they aren't recorded, otherwise 1 + the index of
+# their option in common.VOTE_OPTIONS
+NO_VOTE = 0
+OPTIONS = (None,) + tuple(common.VOTE_OPTIONS)
+OPTION_CODES = {option: code for code, option in enumerate(OPTIONS) if option}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for vote matrices, install the analytics extra")
+
+
+class VoteMatrix(object):
+    """
+    A people × votes matrix of option codes.
+
+    ``matrix[i, j]`` is how ``person_ids[i]`` voted on ``vote_event_ids[j]``.  People are
+    sorted by id and votes are in the order given, chronological for ``for_session``.
+    Only votes resolved to a person are included.
+    """
+
+    def __init__(self, matrix, person_ids, vote_event_ids):
+        self.matrix = matrix
+        self.person_ids = person_ids
+        self.vote_event_ids = vote_event_ids
+        self._person_index = None
+        self._vote_event_index = None
+
+    @staticmethod
+    def code(option):
+        return OPTION_CODES[option]
+
+    @staticmethod
+    def option(code):
+        return OPTIONS[code]
+
+    def person_index(self, person_id):
+        if self._person_index is None:
+            self._person_index = {pid: i for i, pid in enumerate(self.person_ids)}
+        return self._person_index[person_id]
+
+    def vote_event_index(self, vote_event_id):
+        if self._vote_event_index is None:
+            self._vote_event_index = {vid: i for i, vid in enumerate(self.vote_event_ids)}
+        return self._vote_event_index[vote_event_id]
+
+    @classmethod
+    def from_votes(cls, votes, vote_event_ids=None):
+        """
+        Build a matrix from an iterable of (vote event id, voter id, option).
+
+        With ``vote_event_ids`` the columns are exactly those votes, in that order, and
+        votes on any other event are ignored; otherwise votes are added as they appear.
+        Options not in common.VOTE_OPTIONS count as "other".
+        """
+        _require_numpy()
+        fixed_columns = vote_event_ids is not None
+        vote_index = {vid: i for i, vid in enumerate(vote_event_ids or ())}
+        person_index = {}
+        rows, columns, codes = array("l"), array("l"), array("b")
+        other = OPTION_CODES["other"]
+
+        for vote_event_id, voter_id, option in votes:
+            column = vote_index.get(vote_event_id)
+            if column is None:
+                if fixed_columns:
+                    continue
+                column = vote_index[vote_event_id] = len(vote_index)
+            rows.append(person_index.setdefault(voter_id, len(person_index)))
+            columns.append(column)
+            codes.append(OPTION_CODES.get(option, other))
+
+        # renumber people in id order
+        person_ids = sorted(person_index)
+        renumber = np.empty(len(person_ids), dtype=np.intp)
+        for new, person_id in enumerate(person_ids):
+            renumber[person_index[person_id]] = new
+
+        matrix = np.zeros((len(person_ids), len(vote_index)), dtype=np.int8)
+        rows = renumber[np.frombuffer(rows, dtype=np.dtype("l"))]
+        matrix[rows, np.frombuffer(columns, dtype=np.dtype("l"))] = np.frombuffer(
+            codes, dtype=np.int8
+        )
+        vote_event_ids = sorted(vote_index, key=vote_index.get)
+        return cls(matrix, person_ids, vote_event_ids)
+
+    @classmethod
+    def for_session(cls, legislative_session, organization=None, chunk_size=10000):
+        """
+        The matrix of every vote in a session, optionally only those of one organization.
+
+        Votes are streamed from the database with a values_list iterator, so even
+        sessions with millions of individual votes don't need to fit in memory as objects.
+        """
+        from .models import PersonVote, VoteEvent
+
+        vote_events = VoteEvent.objects.filter(
+            legislative_session_id=getattr(legislative_session, "pk", legislative_session)
+        )
+        if organization:
+            vote_events = vote_events.filter(
+                organization_id=getattr(organization, "pk", organization)
+            )
+        vote_event_ids = list(
+            vote_events.order_by("start_timestamp", "start_date", "id").values_list(
+                "id", flat=True
+            )
+        )
+
+        votes = (
+            PersonVote.objects.filter(vote_event__in=vote_events, voter__isnull=False)
+            .order_by()
+            .values_list("vote_event_id", "voter_id", "option")
+        )
+        return cls.from_votes(votes.iterator(chunk_size=chunk_size), vote_event_ids)
+
+    def save(self, path):
+        """ save to a compressed .npz file """
+        np.savez_compressed(
+            path,
+            matrix=self.matrix,
+            person_ids=np.array(self.person_ids, dtype=str),
+            vote_event_ids=np.array(self.vote_event_ids, dtype=str),
+            options=np.array(OPTIONS[1:], dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path):
+        _require_numpy()
+        with np.load(path) as data:
+            if tuple(data["options"]) != OPTIONS[1:]:
+                raise ValueError("{} was saved with different vote options".format(path))
+            return cls(
+                data["matrix"],
+                data["person_ids"].tolist(),
+                data["vote_event_ids"].tolist(),
+            )
@@ -0,0 +1,148 @@
+"""
+Set-based checks of VoteCount totals against the individual PersonVote rows.
+
+Only vote events with both counts and individual votes are compared, since many sources
+only publish one or the other.
+"""
+from django.db import connection
+
+# per vote event & option: the recorded count total and the number of individual votes
+TOTALS_SQL = """
+WITH events AS (
+    SELECT ve.id, ve.legislative_session_id
+    FROM opencivicdata_voteevent ve
+    JOIN opencivicdata_legislativesession ls ON ls.id = ve.legislative_session_id
+    WHERE {where}
+), counts AS (
+    SELECT vc.vote_event_id, vc.option, SUM(vc.value) AS value
+    FROM opencivicdata_votecount vc JOIN events e ON e.id = vc.vote_event_id
+    GROUP BY vc.vote_event_id, vc.option
+), votes AS (
+    SELECT pv.vote_event_id, pv.option, COUNT(*) AS value
+    FROM opencivicdata_personvote pv JOIN events e ON e.id = pv.vote_event_id
+    GROUP BY pv.vote_event_id, pv.option
+), totals AS (
+    SELECT
+        COALESCE(c.vote_event_id, v.vote_event_id) AS vote_event_id,
+        COALESCE(c.option, v.option) AS option,
+        c.value AS count_value,
+        v.value AS vote_value
+    FROM counts c FULL OUTER JOIN votes v
+        ON v.vote_event_id = c.vote_event_id AND v.option = c.option
+)
+"""
+
+SUMMARY_SQL = (
+    TOTALS_SQL
+    + """
+, event_totals AS (
+    SELECT
+        t.vote_event_id,
+        bool_or(t.count_value IS NOT NULL) AS has_counts,
+        bool_or(t.vote_value IS NOT NULL) AS has_votes,
+        bool_or(COALESCE(t.count_value, 0) <> COALESCE(t.vote_value, 0)) AS mismatched
+    FROM totals t
+    GROUP BY t.vote_event_id
+)
+SELECT
+    e.legislative_session_id,
+    COUNT(*) FILTER (WHERE et.has_counts AND et.has_votes),
+    COUNT(*) FILTER (WHERE et.has_counts AND et.has_votes AND et.mismatched),
+    COUNT(*) FILTER (WHERE et.has_votes AND NOT et.has_counts)
+FROM event_totals et JOIN events e ON e.id = et.vote_event_id
+GROUP BY e.legislative_session_id
+ORDER BY e.legislative_session_id
+"""
+)
+
+MISMATCHES_SQL = (
+    TOTALS_SQL
+    + """
+, compared AS (
+    SELECT vote_event_id FROM totals
+    GROUP BY vote_event_id
+    HAVING bool_or(count_value IS NOT NULL) AND bool_or(vote_value IS NOT NULL)
+        AND bool_or(COALESCE(count_value, 0) <> COALESCE(vote_value, 0))
+    {after}
+    ORDER BY vote_event_id
+    LIMIT %s
+)
+SELECT t.vote_event_id, t.option, COALESCE(t.count_value, 0), COALESCE(t.vote_value, 0)
+FROM totals t JOIN compared USING (vote_event_id)
+ORDER BY t.vote_event_id, t.option
+"""
+)
+
+# VoteCount ids are uuids generated in Python normally, md5() gives one on any version
+DERIVE_COUNTS_SQL = """
+INSERT INTO opencivicdata_votecount (id, vote_event_id, option, value)
+SELECT
+    md5(pv.vote_event_id || pv.option || random()::text || clock_timestamp()::text)::uuid,
+    pv.vote_event_id,
+    pv.option,
+    COUNT(*)
+FROM opencivicdata_personvote pv
+JOIN opencivicdata_voteevent ve ON ve.id = pv.vote_event_id
+JOIN opencivicdata_legislativesession ls ON ls.id = ve.legislative_session_id
+WHERE {where} AND NOT EXISTS (
+    SELECT 1 FROM opencivicdata_votecount vc WHERE vc.vote_event_id = pv.vote_event_id
+)
+GROUP BY pv.vote_event_id, pv.option
+"""
+
+
+def _scope(jurisdiction=None, session=None):
+    where, params = ["TRUE"], []
+    if jurisdiction:
+        where.append("ls.jurisdiction_id = %s")
+        params.append(getattr(jurisdiction, "pk", jurisdiction))
+    if session:
+        where.append("ls.id = %s")
+        params.append(getattr(session, "pk", session))
+    return " AND ".join(where), params
+
+
+def vote_count_summary(jurisdiction=None, session=None):
+    """
+    Compare counts & individual votes across a jurisdiction or session in one query.
+
+    Returns a list of (legislative session id, vote events compared, vote events whose
+    counts don't match their individual votes, vote events with individual votes but
+    no counts).
+    """
+    where, params = _scope(jurisdiction, session)
+    with connection.cursor() as cursor:
+        cursor.execute(SUMMARY_SQL.format(where=where), params)
+        return cursor.fetchall()
+
+
+def vote_count_mismatches(jurisdiction=None, session=None, after=None, limit=1000):
+    """
+    The options of up to ``limit`` mismatched vote events, ordered by vote event id.
+
+    Returns a list of (vote event id, option, counted, individual votes), pass the last
+    vote event id as ``after`` to get the next page.
+    """
+    where, params = _scope(jurisdiction, session)
+    if after:
+        params.append(after)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            MISMATCHES_SQL.format(
+                where=where, after="AND vote_event_id > %s" if after else ""
+            ),
+            params + [limit],
+        )
+        return cursor.fetchall()
+
+
+def derive_vote_counts(jurisdiction=None, session=None):
+    """
+    Create VoteCounts from the individual votes of vote events that have none.
+
+    Returns the number of VoteCount rows created.
+    """
+    where, params = _scope(jurisdiction, session)
+    with connection.cursor() as cursor:
+        cursor.execute(DERIVE_COUNTS_SQL.format(where=where), params)
+        return cursor.rowcount
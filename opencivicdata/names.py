@@ -0,0 +1,128 @@
+"""
+Normalisation and in-memory matching of people's (and organizations') names.
+
+Scraped data refers to people by whatever name the source used: "Sen. Smith",
+"SMITH, JOHN A." or "John Smith Jr.".  These helpers reduce names to a comparable form and
+match them against an index of known people without a query per name.
+"""
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+
+HONORIFICS = {
+    "assemblyman",
+    "assemblymember",
+    "assemblywoman",
+    "councilman",
+    "councilmember",
+    "councilwoman",
+    "del",
+    "delegate",
+    "dr",
+    "hon",
+    "mr",
+    "mrs",
+    "ms",
+    "rep",
+    "representative",
+    "sen",
+    "senator",
+    "speaker",
+}
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "md", "phd", "esq"}
+
+# tiers in which names are indexed, earlier tiers win over later ones
+FULL_NAME, INITIAL_AND_FAMILY_NAME, FAMILY_NAME = range(3)
+
+_NON_WORD_RE = re.compile(r"[^\w\s,]+")
+
+
+def normalize_name(name):
+    """
+    Reduce a name to a lowercase, accent and punctuation free form.
+
+    A single comma is taken to separate the family name from the rest as in sort names,
+    so "Smith, John" and "John Smith" normalise to the same "john smith".  Honorifics and
+    generational suffixes are dropped.
+    """
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(c for c in name if not unicodedata.combining(c)).lower()
+    name = _NON_WORD_RE.sub(" ", name)
+
+    parts = [part.split() for part in name.split(",")]
+    parts = [[w for w in words if w not in SUFFIXES] for words in parts]
+    parts = [words for words in parts if words]
+    if len(parts) == 2:
+        parts.reverse()
+    words = [w for words in parts for w in words]
+
+    while words and words[0] in HONORIFICS:
+        words.pop(0)
+    return " ".join(words)
+
+
+def normalize_organization_name(name):
+    """
+    Reduce an organization name to a lowercase, accent and punctuation free form.
+    """
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(c for c in name if not unicodedata.combining(c)).lower()
+    words = _NON_WORD_RE.sub(" ", name).replace(",", " ").split()
+    if words and words[0] == "the":
+        words.pop(0)
+    return " ".join(words)
+
+
+class NameMatch(namedtuple("NameMatch", "name ids")):
+    """
+    The outcome of matching a single raw name, ``ids`` holds every candidate found.
+    """
+
+    @property
+    def id(self):
+        """ the matched id, or None if there was no match or it was ambiguous """
+        return self.ids[0] if len(self.ids) == 1 else None
+
+    @property
+    def ambiguous(self):
+        return len(self.ids) > 1
+
+
+class NameIndex(object):
+    """
+    In-memory index from normalised names to the ids of the people they may refer to.
+
+    Names are added in tiers: full names are tried first, then the first initial plus
+    family name, then the family name alone.  A lookup stops at the first tier with any
+    candidates, so "Smith" only resolves by family name if no one's full name matches.
+    """
+
+    def __init__(self, normalizer=normalize_name):
+        self.normalizer = normalizer
+        self._tiers = defaultdict(lambda: defaultdict(set))
+
+    def add(self, key, name, tier=FULL_NAME):
+        normalized = self.normalizer(name)
+        if normalized:
+            self._tiers[tier][normalized].add(key)
+
+    def add_person(self, key, name, sort_name="", given_name="", family_name="", other_names=()):
+        """ index every form of a person's name """
+        for full_name in (name, sort_name) + tuple(other_names):
+            self.add(key, full_name)
+        if family_name:
+            if given_name:
+                self.add(key, "{} {}".format(given_name[0], family_name), INITIAL_AND_FAMILY_NAME)
+            self.add(key, family_name, FAMILY_NAME)
+
+    def match(self, name):
+        normalized = self.normalizer(name)
+        for tier in sorted(self._tiers):
+            ids = self._tiers[tier].get(normalized)
+            if ids:
+                return NameMatch(name, tuple(sorted(ids)))
+        return NameMatch(name, ())
+
+    def match_all(self, names):
+        """ match a batch of names, returning a dict of raw name to NameMatch """
+        return {name: self.match(name) for name in set(names)}
@@ -0,0 +1,62 @@
+import pytest
+from django.core.management import call_command
+from opencivicdata.core.models import Organization, Person
+from opencivicdata.legislative.analytics import agreement, party_unity, rice_cohesion
+from opencivicdata.legislative.models import PersonVoteSummary, VoteEventCohesion
+from opencivicdata.legislative.rollcall import VoteMatrix
+
+np = pytest.importorskip("numpy")
+
+Y, N, A = VoteMatrix.code("yes"), VoteMatrix.code("no"), VoteMatrix.code("absent")
+
+# two parties of two, on four votes: the last two are party-line votes
+CODES = np.array(
+    [
+        [Y, Y, Y, N],  # D
+        [Y, N, Y, A],  # D
+        [Y, Y, N, Y],  # R
+        [Y, Y, N, N],  # R
+    ],
+    dtype=np.int8,
+)
+PARTIES = ["D", "D", "R", "R"]
+
+
+def test_agreement():
+    scores, shared = agreement(CODES)
+    assert shared[0].tolist() == [4, 3, 4, 4]
+    assert scores[0, 1] == pytest.approx(2 / 3)
+    assert scores[0, 2] == pytest.approx(0.5)
+    assert np.isnan(agreement(np.zeros((2, 2), dtype=np.int8))[0]).all()
+
+
+def test_rice_cohesion():
+    yes, no, rice = rice_cohesion(CODES)
+    assert yes.tolist() == [4, 3, 2, 1]
+    assert rice.tolist() == pytest.approx([1, 0.5, 0, 1 / 3])
+    rice = rice_cohesion(CODES, np.array([True, True, False, False]))[2]
+    assert rice.tolist() == pytest.approx([1, 0, 1, 1])
+
+
+def test_party_unity():
+    scores, counts = party_unity(CODES, PARTIES)
+    # only vote 3 is a party unity vote: D voted yes, R no (vote 4 has R tied)
+    assert counts.tolist() == [1, 1, 1, 1]
+    assert scores.tolist() == [1, 1, 1, 1]
+
+    scores, counts = party_unity(CODES, ["D", None, "R", "R"])
+    assert counts[1] == 0
+    assert np.isnan(scores[1])
+
+
+@pytest.mark.django_db
+def test_update_vote_summaries(vote_event):
+    party = Organization.objects.create(name="Democratic", classification="party")
+    for name, option in (("Ann", "yes"), ("Bob", "no")):
+        person = Person.objects.create(name=name)
+        party.memberships.create(person=person)
+        vote_event.votes.create(voter=person, voter_name=name, option=option)
+    call_command("computevoteanalytics", vote_event.legislative_session_id)
+    ann = PersonVoteSummary.objects.get(person__name="Ann")
+    assert (ann.votes_cast, ann.party_id) == (1, party.id)
+    assert VoteEventCohesion.objects.get(vote_event=vote_event, party=None).rice_index == 0
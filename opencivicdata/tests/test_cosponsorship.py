@@ -0,0 +1,67 @@
+import io
+
+import pytest
+from opencivicdata.core.models import Person
+from opencivicdata.legislative.cosponsorship import SponsorshipMatrix
+
+pytest.importorskip("scipy")
+
+SPONSORSHIPS = [
+    ("b1", "p1"),
+    ("b1", "p2"),
+    ("b1", "p2"),
+    ("b2", "p1"),
+    ("b2", "p2"),
+    ("b2", "p3"),
+    ("b3", "p3"),
+]
+
+
+def test_from_sponsorships():
+    matrix = SponsorshipMatrix.from_sponsorships(SPONSORSHIPS)
+    assert matrix.bill_ids == ["b1", "b2", "b3"]
+    assert matrix.person_ids == ["p1", "p2", "p3"]
+    assert matrix.incidence.toarray().tolist() == [[1, 1, 0], [1, 1, 1], [0, 0, 1]]
+    assert matrix.adjacency.toarray().tolist() == [[0, 2, 1], [2, 0, 1], [1, 1, 0]]
+
+
+def test_collaborators():
+    matrix = SponsorshipMatrix.from_sponsorships(SPONSORSHIPS)
+    assert matrix.collaborators("p1") == [("p2", 2), ("p3", 1)]
+    assert matrix.collaborators("p3", k=1) == [("p1", 1)]
+
+
+def test_edges():
+    matrix = SponsorshipMatrix.from_sponsorships(SPONSORSHIPS)
+    out = io.StringIO()
+    matrix.write_edges(out)
+    assert out.getvalue().splitlines() == [
+        "person_id,other_person_id,shared_bills",
+        "p1,p2,2",
+        "p1,p3,1",
+        "p2,p3,1",
+    ]
+
+
+def test_save_and_load(tmp_path):
+    matrix = SponsorshipMatrix.from_sponsorships(SPONSORSHIPS)
+    matrix.save(str(tmp_path / "sponsorships.npz"))
+    loaded = SponsorshipMatrix.load(str(tmp_path / "sponsorships.npz"))
+    assert loaded.bill_ids == matrix.bill_ids
+    assert loaded.person_ids == matrix.person_ids
+    assert (loaded.incidence != matrix.incidence).nnz == 0
+
+
+@pytest.mark.django_db
+def test_for_session(bill, person):
+    other = Person.objects.create(name="Maria Shriver")
+    bill.sponsorships.create(name=person.name, entity_type="person", person=person, primary=True)
+    bill.sponsorships.create(name=other.name, entity_type="person", person=other)
+    bill.sponsorships.create(name="Unresolved", entity_type="person")
+
+    matrix = SponsorshipMatrix.for_session(bill.legislative_session)
+    assert matrix.bill_ids == [bill.id]
+    assert matrix.collaborators(person.id) == [(other.id, 1)]
+    assert SponsorshipMatrix.for_session(bill.legislative_session, primary=True).person_ids == [
+        person.id
+    ]
@@ -0,0 +1,70 @@
+from datetime import date, datetime, timezone
+
+from opencivicdata.dates import parse_timestamp, partial_date_bounds, partial_date_range
+
+
+def test_partial_date_bounds():
+    assert partial_date_bounds("2017") == (date(2017, 1, 1), date(2017, 12, 31))
+    assert partial_date_bounds("2016-02") == (date(2016, 2, 1), date(2016, 2, 29))
+    assert partial_date_bounds("2017-02-16") == (date(2017, 2, 16), date(2017, 2, 16))
+    # trailing times are ignored
+    assert partial_date_bounds("2017-02-16T12:00:00") == (
+        date(2017, 2, 16),
+        date(2017, 2, 16),
+    )
+
+
+def test_partial_date_bounds_unknown():
+    assert partial_date_bounds("") == (None, None)
+    assert partial_date_bounds(None) == (None, None)
+    assert partial_date_bounds("unknown") == (None, None)
+    assert partial_date_bounds("0000-01-01") == (None, None)
+    # out of range parts fall back to the coarser precision
+    assert partial_date_bounds("2017-13") == (date(2017, 1, 1), date(2017, 12, 31))
+    assert partial_date_bounds("2017-02-30") == (date(2017, 2, 1), date(2017, 2, 28))
+
+
+def test_partial_date_range():
+    assert partial_date_range("2017", "2018-06") == (date(2017, 1, 1), date(2018, 6, 30))
+    assert partial_date_range("", "2018") == (None, date(2018, 12, 31))
+    assert partial_date_range("2017-05", "") == (date(2017, 5, 1), None)
+    assert partial_date_range("", "") == (None, None)
+    # same partial date at both ends
+    assert partial_date_range("2017", "2017") == (date(2017, 1, 1), date(2017, 12, 31))
+    # end before start
+    assert partial_date_range("2018", "2017") is None
+    # unparseable dates are unknown, not unbounded
+    assert partial_date_range("unknown", "2018") is None
+    assert partial_date_range("2017", "n/a") is None
+
+
+def test_parse_timestamp_precision():
+    assert parse_timestamp("2017") == (datetime(2017, 1, 1, tzinfo=timezone.utc), "year")
+    assert parse_timestamp("2017-02") == (datetime(2017, 2, 1, tzinfo=timezone.utc), "month")
+    assert parse_timestamp("2017-02-16") == (datetime(2017, 2, 16, tzinfo=timezone.utc), "day")
+    assert parse_timestamp("2017-02-16 09:30") == (
+        datetime(2017, 2, 16, 9, 30, tzinfo=timezone.utc),
+        "minute",
+    )
+
+
+def test_parse_timestamp_offsets():
+    # converted to UTC, naive times are taken to be UTC already
+    assert parse_timestamp("2017-02-16T21:30:05-05:00") == (
+        datetime(2017, 2, 17, 2, 30, 5, tzinfo=timezone.utc),
+        "second",
+    )
+    assert parse_timestamp("2017-02-16 09:30:00")[0] == parse_timestamp(
+        "2017-02-16 09:30:00Z"
+    )[0]
+
+
+def test_parse_timestamp_invalid():
+    assert parse_timestamp("") == (None, "")
+    assert parse_timestamp(None) == (None, "")
+    assert parse_timestamp("soon") == (None, "")
+    # a bad time leaves the day
+    assert parse_timestamp("2017-02-16 25:00") == (
+        datetime(2017, 2, 16, tzinfo=timezone.utc),
+        "day",
+    )
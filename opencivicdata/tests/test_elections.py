@@ -1,4 +1,5 @@
 import pytest
+from opencivicdata.elections.models import Election, CandidateContest
 
 
 @pytest.mark.django_db
@@ -11,6 +12,16 @@ def test_election_identifier_str(election_identifier):
     assert election_identifier.identifier in str(election_identifier)
 
 
+@pytest.mark.django_db
+def test_election_by_identifiers(election_identifier, candidate_contest_identifier):
+    assert Election.objects.by_identifiers("calaccess_election_id", ["65"]) == {
+        "65": election_identifier.election
+    }
+    assert CandidateContest.objects.by_identifiers("calaccess_contest_id", ["GOV"]) == {
+        "GOV": candidate_contest_identifier.contest
+    }
+
+
 @pytest.mark.django_db
 def test_candidate_contest_str(candidate_contest):
     assert candidate_contest.name in str(candidate_contest)
@@ -0,0 +1,104 @@
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.management import call_command
+from opencivicdata.legislative.extraction import (
+    best_version_links,
+    extract_document,
+    extract_file,
+    extract_text,
+    fetch_document,
+    fetch_url,
+    text_sha256,
+)
+from opencivicdata.legislative.management.commands.extractbilltext import Command
+from opencivicdata.legislative.models import Bill, BillText, SearchableBill
+
+
+def test_extract_html():
+    html = b"""<html><head><title>HB 1</title><style>p {}</style></head>
+        <body><p>Be it   enacted&nbsp;by the</p><script>var x;</script><p>Legislature</p>
+        </body></html>"""
+    assert extract_text(html, "text/html; charset=utf-8") == "Be it enacted by the Legislature"
+
+
+def test_extract_plain():
+    assert extract_text(b"Section 1.\n\n  Short title\x00", "text/plain") == (
+        "Section 1. Short title"
+    )
+
+
+def test_extract_document_errors():
+    def fetch(url):
+        raise IOError("not found")
+
+    assert extract_document(("http://example.com/", "text/html"), fetch) == (
+        "",
+        "OSError: not found",
+    )
+    assert extract_document(("http://example.com/", "image/png"), lambda url: b"")[1]
+    assert extract_document(("http://example.com/", "text/plain"), lambda url: b"  ") == (
+        "",
+        "no text found",
+    )
+
+
+def test_best_version_links():
+    links = [
+        (1, "a", "a-introduced.pdf", "application/pdf", "2017-01-01"),
+        (2, "a", "a-enrolled.pdf", "application/pdf", "2017-03-01"),
+        (3, "a", "a-enrolled.html", "text/html", "2017-03-01"),
+        (4, "b", "b.doc", "application/msword", "2017-03-01"),
+    ]
+    assert best_version_links(links) == {"a": (3, "a-enrolled.html", "text/html")}
+
+
+def test_fetch_and_extract_file(tmp_path):
+    data = b"<p>Section 1.</p>\n<p>Short   title</p>"
+    digest, path, error = fetch_document("x", str(tmp_path), lambda url: data)
+    assert error is None
+    # documents are keyed by their bytes, texts by their normalized form
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert extract_file((path, "text/html")) == ("Section 1. Short title", None)
+    assert text_sha256("Section 1. Short title") == (
+        hashlib.sha256(b"Section 1. Short title").hexdigest()
+    )
+    assert text_sha256("Section 1. Short title") != digest
+
+
+@pytest.mark.django_db
+def test_extractbilltext_command(bill, tmp_path):
+    document = tmp_path / "hr3590.html"
+    document.write_text("<p>An Act entitled The Patient Protection and Affordable Care Act</p>")
+    version = bill.versions.create(note="Enrolled", date="2010-03-23")
+    version.links.create(url=document.as_uri(), media_type="text/html")
+
+    call_command("extractbilltext", workers=1)
+    searchable = SearchableBill.objects.get(bill=bill)
+    assert not searchable.is_error
+    assert searchable.content.text.startswith("An Act entitled")
+    assert bill.title in searchable.all_titles
+    assert list(Bill.objects.search("entitled")) == [bill]
+
+    # already extracted bills are skipped, the same document under another url is stored once
+    copy = Bill.objects.create(
+        legislative_session=bill.legislative_session, identifier="HR 3591", title="Copy"
+    )
+    duplicate = tmp_path / "hr3591.html"
+    duplicate.write_bytes(document.read_bytes())
+    version = copy.versions.create(note="Introduced", date="2010-03-24")
+    version.links.create(url=duplicate.as_uri(), media_type="text/html")
+    out = io.StringIO()
+    call_command("extractbilltext", workers=1, stdout=out)
+    assert "1 extracted, 0 errors" in out.getvalue()
+    assert SearchableBill.objects.count() == 2
+    assert BillText.objects.count() == 1
+
+    # bills another run got to first aren't counted
+    command = Command()
+    command.fetcher = fetch_url
+    with ThreadPoolExecutor(1) as executor:
+        assert command.extract_batch([bill.id, copy.id], executor, str(tmp_path)) == []
+    assert SearchableBill.objects.count() == 2
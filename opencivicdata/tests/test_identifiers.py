@@ -0,0 +1,16 @@
+from opencivicdata.identifiers import normalize_bill_identifier
+
+
+def test_normalize_bill_identifier():
+    for identifier in ("HB 1", "H.B. 1", "HB0001", "hb1", " HB  01 "):
+        assert normalize_bill_identifier(identifier) == "HB1"
+    assert normalize_bill_identifier("SB 2010") == "SB2010"
+    assert normalize_bill_identifier("HJR 3/100") == "HJR3-100"
+    assert normalize_bill_identifier("AB 10-001") == "AB10-1"
+    assert normalize_bill_identifier("AB 10 - 001") == "AB10-1"
+    assert normalize_bill_identifier("AB 101") == "AB101"
+    assert normalize_bill_identifier("AB 10-001") != normalize_bill_identifier("AB 101")
+    assert normalize_bill_identifier("AB 10001") == "AB10001"
+    assert normalize_bill_identifier("0") == "0"
+    assert normalize_bill_identifier("") == ""
+    assert normalize_bill_identifier(None) == ""
@@ -0,0 +1,189 @@
+import pytest
+from django.core.management import call_command
+from opencivicdata.core.models import Organization, Person
+from opencivicdata.legislative.linking import (
+    link_related_bills,
+    link_vote_actions,
+    pair_votes_with_actions,
+    resolve_related_entities,
+    resolve_voters,
+    score_vote_action,
+)
+
+
+@pytest.fixture
+def senate(jurisdiction):
+    senate = Organization.objects.create(name="Senate", jurisdiction=jurisdiction)
+    smith = Person.objects.create(name="John Smith", family_name="Smith")
+    senate.memberships.create(person=smith)
+    return senate
+
+
+@pytest.mark.django_db
+def test_resolve_related_entities(senate, bill, django_assert_max_num_queries):
+    smith = Person.objects.get(name="John Smith")
+    committee = Organization.objects.create(
+        name="Committee on Energy", jurisdiction=senate.jurisdiction
+    )
+    bill.sponsorships.create(name="Sen. Smith", entity_type="person", primary=True)
+    bill.sponsorships.create(name="The Committee on Energy", entity_type="organization")
+    bill.sponsorships.create(name="Nobody", entity_type="person")
+
+    seen = []
+    # lookups, then a single update per entity type: no per-row queries
+    with django_assert_max_num_queries(9):
+        stats = resolve_related_entities(
+            "billsponsorship", chunk_size=2, progress=seen.append
+        )
+    assert stats["scanned"] == 3
+    assert stats["resolved"] == 2
+    assert len(seen) == 2
+
+    assert bill.sponsorships.get(name="Sen. Smith").person == smith
+    assert bill.sponsorships.get(name="The Committee on Energy").organization == committee
+    assert bill.sponsorships.get(name="Nobody").person is None
+
+    # resumable & idempotent: only the unresolved row remains
+    stats = resolve_related_entities("billsponsorship", after=seen[0]["last_id"])
+    assert stats["resolved"] == 0
+
+
+@pytest.mark.django_db
+def test_resolveentities_command(senate, event, capsys):
+    event.participants.create(name="John Smith", entity_type="person", note="")
+    call_command("resolveentities", "eventparticipant")
+    assert event.participants.get().person.name == "John Smith"
+    assert "1 resolved" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_link_related_bills(bill):
+    companion = bill.legislative_session.bills.create(identifier="SB 12", title="Companion")
+    found = bill.related_bills.create(
+        identifier="sb0012", legislative_session="2017", relation_type="companion"
+    )
+    missing = bill.related_bills.create(
+        identifier="SB 13", legislative_session="2017", relation_type="companion"
+    )
+    other_session = bill.related_bills.create(
+        identifier="SB 12", legislative_session="2015", relation_type="prior-session"
+    )
+
+    assert link_related_bills() == 1
+    found.refresh_from_db()
+    missing.refresh_from_db()
+    other_session.refresh_from_db()
+    assert found.related_bill == companion
+    assert missing.related_bill is None
+    assert other_session.related_bill is None
+
+    # already linked rows are left alone
+    assert link_related_bills(jurisdiction=bill.legislative_session.jurisdiction) == 0
+
+
+@pytest.mark.django_db
+def test_resolve_voters(senate, vote_event):
+    smith = Person.objects.get(name="John Smith")
+    # another Smith who had left before the vote
+    former = Person.objects.create(name="Jane Smith", family_name="Smith")
+    senate.memberships.create(person=former, end_date="2016-12-31")
+    vote_event.organization = senate
+    vote_event.save()
+    vote_event.votes.create(voter_name="Smith", option="yes")
+    vote_event.votes.create(voter_name="Nobody", option="no")
+
+    stats = resolve_voters(vote_event.legislative_session)
+    assert stats["scanned"] == 2
+    assert stats["resolved"] == 1
+    assert vote_event.votes.get(voter_name="Smith").voter == smith
+    assert vote_event.votes.get(voter_name="Nobody").voter is None
+
+    # before either Smith left, the name is ambiguous
+    vote_event.votes.create(voter_name="Smith", option="yes")
+    vote_event.start_date = "2016-06-01"
+    vote_event.save()
+    stats = resolve_voters(vote_event.legislative_session)
+    assert stats["resolved"] == 0
+    assert stats["ambiguous"] == 1
+
+
+def test_pair_votes_with_actions():
+    assert score_vote_action(["bill-passage"], "pass", "", ["passage"], "") == 1
+    assert score_vote_action(["bill-passage"], "fail", "", ["passage"], "") == 0
+    assert score_vote_action([], "pass", "Third reading", [], "Passed third reading") == (
+        pytest.approx(2 / 3)
+    )
+
+    # each pair is the other's best option
+    assert pair_votes_with_actions({("v1", "a1"): 1, ("v1", "a2"): 0.5, ("v2", "a2"): 1}) == {
+        "v1": "a1",
+        "v2": "a2",
+    }
+    # v2 takes a1, leaving a2 as v1's best remaining option
+    assert pair_votes_with_actions({("v1", "a1"): 1, ("v1", "a2"): 0.5, ("v2", "a1"): 2}) == {
+        "v1": "a2",
+        "v2": "a1",
+    }
+    # ties & unrelated pairs are left alone
+    assert pair_votes_with_actions({("v1", "a1"): 1, ("v1", "a2"): 1, ("v2", "a3"): 0}) == {}
+
+
+@pytest.mark.django_db
+def test_link_vote_actions(bill, vote_event):
+    org = vote_event.organization
+    reading = bill.actions.create(
+        organization=org, description="Read second time", date="2017-02-16", order=1
+    )
+    passage = bill.actions.create(
+        organization=org,
+        description="Passed",
+        date="2017-02-16",
+        classification=["passage"],
+        order=2,
+    )
+    bill.actions.create(
+        organization=org,
+        description="Passed",
+        date="2017-02-17",
+        classification=["passage"],
+        order=3,
+    )
+    vote_event.bill = bill
+    vote_event.motion_classification = ["bill-passage"]
+    vote_event.save()
+
+    assert link_vote_actions() == 1
+    vote_event.refresh_from_db()
+    assert vote_event.bill_action == passage
+    assert not hasattr(reading, "vote")
+
+    # idempotent
+    assert link_vote_actions(legislative_session=vote_event.legislative_session) == 0
+
+
+@pytest.mark.django_db
+def test_link_vote_actions_local_date(bill, vote_event):
+    org = vote_event.organization
+    passage = bill.actions.create(
+        organization=org,
+        description="Passed",
+        date="2017-02-16",
+        classification=["passage"],
+        order=1,
+    )
+    bill.actions.create(
+        organization=org,
+        description="Passed",
+        date="2017-02-17",
+        classification=["passage"],
+        order=2,
+    )
+    # an evening vote is on the next day in UTC, but pairs with its local day's action
+    vote_event.bill = bill
+    vote_event.start_date = "2017-02-16 19:30:00-05:00"
+    vote_event.motion_classification = ["bill-passage"]
+    vote_event.save()
+
+    assert link_vote_actions() == 1
+    vote_event.refresh_from_db()
+    assert vote_event.bill_action == passage
@@ -1,6 +1,26 @@
+import re
 import pytest
-from opencivicdata.core.models import Jurisdiction, Division, Organization, Person
+from datetime import date
+from opencivicdata.core.models import (
+    Jurisdiction,
+    Division,
+    Membership,
+    Organization,
+    Person,
+)
+from opencivicdata.legislative.models import (
+    Bill,
+    BillStatus,
+    Event,
+    SearchableBill,
+    VoteEvent,
+)
+from opencivicdata.legislative.models.bill import invalidate_bill_facets
+from opencivicdata.core.models.people_orgs import DateRange
+from opencivicdata.dates import partial_date_range
+from opencivicdata.identifiers import NORMALIZED_BILL_IDENTIFIER_SQL, normalize_bill_identifier
 from django.core.exceptions import ValidationError
+from django.db import connection
 
 
 def test_division_subtypes_from_id():
@@ -27,6 +47,35 @@ def test_division_subtypes_from_id():
     with pytest.raises(ValueError):
         Division.subtypes_from_id("state:nc/city:raleigh")
 
+    # results are cached, but mutating one must not affect the next caller
+    fields, _ = Division.subtypes_from_id("ocd-division/country:us")
+    fields["redirect_id"] = "ocd-division/country:ca"
+    assert Division.subtypes_from_id("ocd-division/country:us") == (
+        {"country": "us"},
+        1,
+    )
+
+
+def test_division_subtypes_from_ids():
+    assert Division.subtypes_from_ids(
+        ["ocd-division/country:us", "ocd-division/country:us/state:ak"]
+    ) == [
+        ({"country": "us"}, 1),
+        ({"country": "us", "subtype1": "state", "subid1": "ak"}, 2),
+    ]
+
+    # all invalid ids are reported at once
+    with pytest.raises(ValueError) as e:
+        Division.subtypes_from_ids(
+            ["ocd-division/country:us", "country:us/state:ak", "ocd-division/country:USA"]
+        )
+    assert "2 invalid" in str(e.value)
+
+    # validation can be skipped for ids known to be good
+    assert Division.subtypes_from_ids(["country:us"], validate=False) == [
+        ({"country": "us"}, 1)
+    ]
+
 
 @pytest.mark.django_db
 def test_division_create():
@@ -162,6 +211,30 @@ def test_organization_get_parents():
     assert list(o3.get_parents()) == [o2, o1]
 
 
+@pytest.mark.django_db
+def test_organization_hierarchy(django_assert_num_queries):
+    root = Organization.objects.create(name="Legislature")
+    c1 = Organization.objects.create(name="Committee on Agriculture", parent=root)
+    c2 = Organization.objects.create(name="Committee on Budget", parent=root)
+    sub = Organization.objects.create(name="Subcommittee on Dairy", parent=c1)
+
+    with django_assert_num_queries(1):
+        ancestors = list(Organization.objects.ancestors(sub))
+    assert ancestors == [c1, root]
+    assert [o.depth for o in ancestors] == [1, 2]
+
+    with django_assert_num_queries(1):
+        assert list(Organization.objects.descendants(root.id)) == [c1, c2, sub]
+    assert list(Organization.objects.descendants(root, max_depth=1)) == [c1, c2]
+    assert list(Organization.objects.descendants(sub)) == []
+
+    with django_assert_num_queries(1):
+        orgs = {o.id: o for o in Organization.objects.with_ancestry()}
+    assert orgs[sub.id].ancestor_ids == [c1.id, root.id]
+    assert orgs[sub.id].ancestor_names == ["Committee on Agriculture", "Legislature"]
+    assert orgs[root.id].ancestor_ids == []
+
+
 @pytest.mark.django_db
 def test_organization_str():
     o = Organization.objects.create(name="test org")
@@ -194,6 +267,37 @@ def test_organization_identifier():
     assert "test org" in str(o.identifiers.all()[0])
 
 
+@pytest.mark.django_db
+def test_by_identifiers(django_assert_num_queries):
+    orgs = [Organization.objects.create(name="org {}".format(n)) for n in range(3)]
+    for n, o in enumerate(orgs):
+        o.identifiers.create(identifier="org-{}".format(n), scheme="upstream")
+    orgs[0].identifiers.create(identifier="org-1", scheme="other")
+
+    with django_assert_num_queries(3):
+        found = Organization.objects.by_identifiers(
+            "upstream", ["org-0", "org-1", "org-2", "missing"], chunk_size=2
+        )
+    assert found == {"org-0": orgs[0], "org-1": orgs[1], "org-2": orgs[2]}
+
+    # honors existing filters on the queryset
+    assert Organization.objects.exclude(pk=orgs[1].pk).by_identifiers(
+        "upstream", ["org-1", "org-2"]
+    ) == {"org-2": orgs[2]}
+
+    p = Person.objects.create(name="test person")
+    p.identifiers.create(identifier="p-1", scheme="upstream")
+    assert Person.objects.by_identifiers("upstream", ["p-1"]) == {"p-1": p}
+
+
+@pytest.mark.django_db
+def test_bill_by_identifiers(bill):
+    bill.other_identifiers.create(identifier="1001", scheme="senate_clerk_id")
+    assert Bill.objects.by_identifiers("senate_clerk_id", ["1001", "1002"]) == {
+        "1001": bill
+    }
+
+
 @pytest.mark.django_db
 def test_organization_post():
     o = Organization.objects.create(name="test org")
@@ -218,6 +322,123 @@ def test_organization_membership():
     assert len(Person.objects.member_of(o.id)) == 1
 
 
+@pytest.mark.django_db
+def test_membership_date_range():
+    o = Organization.objects.create(name="test org")
+    p = Person.objects.create(name="test person")
+
+    m = o.memberships.create(person=p, start_date="2017", end_date="2018-06")
+    m.refresh_from_db()
+    assert m.date_range.lower == date(2017, 1, 1)
+    # ranges are stored in canonical [) form
+    assert m.date_range.upper == date(2018, 7, 1)
+
+    assert o.memberships.active_on(date(2017, 1, 1)).count() == 1
+    assert o.memberships.active_on(date(2018, 6, 30)).count() == 1
+    assert o.memberships.active_on(date(2018, 7, 1)).count() == 0
+    assert o.memberships.active_on("2018-06-30").count() == 1
+    assert o.memberships.active_on("2018-07").count() == 0
+    assert o.memberships.active_on("2018").count() == 1
+    assert o.get_current_members().count() == 0
+
+    # kept in sync when only the dates are saved
+    m.end_date = ""
+    m.save(update_fields=["end_date"])
+    assert o.get_current_members().count() == 1
+
+    Membership.objects.bulk_create(
+        [Membership(organization=o, person=p, start_date="2030-01-01")]
+    )
+    assert o.memberships.active_on(date(2030, 1, 1)).count() == 2
+
+    # and however else the dates are written
+    o.memberships.filter(pk=m.pk).update(end_date="2016")
+    assert o.get_current_members().count() == 0
+    m.end_date = ""
+    Membership.objects.bulk_update([m], ["end_date"])
+    assert o.get_current_members().count() == 1
+
+    # unparseable dates are unknown rather than unbounded
+    m.end_date = "unknown"
+    m.save()
+    m.refresh_from_db()
+    assert m.date_range.isempty
+    assert o.get_current_members().count() == 0
+
+
+@pytest.mark.django_db
+def test_membership_date_range_sql():
+    dates = ["", "2017", "2016-02", "2017-02-16", "2017-13", "2017-02-30", "unknown", "0000"]
+    with connection.cursor() as cursor:
+        for start in dates:
+            for end in dates:
+                bounds = partial_date_range(start, end)
+                expected = DateRange(empty=True) if bounds is None else DateRange(*bounds, "[]")
+                cursor.execute(
+                    "SELECT opencivicdata_partial_date_range(%s, %s) = %s",
+                    [start, end, expected],
+                )
+                assert cursor.fetchone()[0], (start, end)
+
+
+@pytest.mark.django_db
+def test_person_member_of():
+    senate = Organization.objects.create(name="Senate")
+    house = Organization.objects.create(name="House")
+    p1 = Person.objects.create(name="Jane Doe")
+    p2 = Person.objects.create(name="John Doe")
+
+    # several qualifying memberships must not duplicate the person
+    senate.memberships.create(person=p1, role="member")
+    senate.memberships.create(person=p1, role="chair")
+    senate.memberships.create(person=p2, start_date="2010", end_date="2012")
+    house.memberships.create(person=p2, start_date="2013")
+
+    assert list(Person.objects.member_of(senate)) == [p1]
+    assert list(Person.objects.member_of("Senate", current_only=False).order_by("name")) == [
+        p1,
+        p2,
+    ]
+    assert Person.objects.member_of([senate.id, "House"]).count() == 2
+    assert list(Person.objects.member_of(senate, as_of=date(2011, 5, 1)).order_by("name")) == [
+        p1,
+        p2,
+    ]
+    assert list(Person.objects.member_of(house, as_of="2012-12-31")) == []
+    assert list(Person.objects.member_of([])) == []
+    assert list(senate.get_current_members()) == [p1]
+
+
+@pytest.mark.django_db
+def test_person_similar_to():
+    Person.objects.create(name="Arnold Schwarzenegger")
+    Person.objects.create(name="Arnold Palmer")
+    Person.objects.create(name="Gray Davis")
+
+    people = list(Person.objects.similar_to("Arnold Schwarzeneger"))
+    assert people[0].name == "Arnold Schwarzenegger"
+    assert people[0].similarity > 0.5
+    assert "Gray Davis" not in [p.name for p in people]
+
+    # a lower threshold lets weaker matches through, still ranked
+    names = [p.name for p in Person.objects.similar_to("Arnold", threshold=0.1)]
+    assert set(names) == {"Arnold Schwarzenegger", "Arnold Palmer"}
+
+    assert Organization.objects.create(name="Missouri Senate") in list(
+        Organization.objects.similar_to("missouri senat")
+    )
+
+    # the requested threshold holds whatever pg_trgm's own threshold is set to
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL pg_trgm.similarity_threshold = 0.9")
+    names = [p.name for p in Person.objects.similar_to("Arnold", threshold=0.3)]
+    assert set(names) == {"Arnold Schwarzenegger", "Arnold Palmer"}
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL pg_trgm.similarity_threshold = 0.1")
+    names = [p.name for p in Person.objects.similar_to("Arnold", threshold=0.3)]
+    assert "Gray Davis" not in names
+
+
 @pytest.mark.django_db
 def test_person_str(person):
     assert person.name in str(person)
@@ -255,6 +476,43 @@ def test_bill_str(bill):
     assert bill.identifier in str(bill)
 
 
+@pytest.mark.django_db
+def test_bill_lookup(bill, legislative_session):
+    assert bill.normalized_identifier == "HR3590"
+    for identifier in ("HR 3590", "H.R. 3590", "hr03590"):
+        assert list(Bill.objects.lookup(legislative_session, identifier)) == [bill]
+    assert list(Bill.objects.lookup(legislative_session.id, "HR 359")) == []
+
+    bill.identifier = "HB 0001"
+    bill.save(update_fields=["identifier"])
+    assert Bill.objects.lookup(legislative_session, "HB1").get() == bill
+
+    (created,) = Bill.objects.bulk_create(
+        [Bill(legislative_session=legislative_session, identifier="S.B. 7", title="x")]
+    )
+    assert Bill.objects.lookup(legislative_session, "sb 7").get() == created
+
+
+@pytest.mark.django_db
+def test_normalized_bill_identifier_sql():
+    identifiers = [
+        "HB 1", "H.B. 0001", "hb1", "H-B 1", "AB 10-001", "AB 101", "AB 10001", "HJR 3/100",
+        "1 2 3", "0", "",
+    ]
+    with connection.cursor() as cursor:
+        for identifier in identifiers:
+            cursor.execute("SELECT " + NORMALIZED_BILL_IDENTIFIER_SQL.format("%s"), [identifier])
+            assert cursor.fetchone()[0] == normalize_bill_identifier(identifier)
+
+
+@pytest.mark.django_db
+def test_bill_title_search(bill):
+    assert list(Bill.objects.title_search("affordable care")) == [bill]
+    assert list(Bill.objects.title_search("affordible car")) == [bill]
+    assert list(Bill.objects.title_search("tax reform")) == []
+    assert list(Bill.objects.identifier_search("HR 359")) == [bill]
+
+
 @pytest.mark.django_db
 def test_bill_abstract(bill):
     bill.abstracts.create(
@@ -320,6 +578,198 @@ def test_bill_action(bill):
     assert p.name in str(a.related_entities.all()[0])
 
 
+@pytest.mark.django_db
+def test_bill_status(bill):
+    lower = Organization.objects.create(name="House", classification="lower")
+    upper = Organization.objects.create(name="Senate", classification="upper")
+    bill.actions.create(
+        organization=lower,
+        description="Introduced",
+        date="2017-01-10",
+        classification=["introduction"],
+        order=1,
+    )
+    passage = bill.actions.create(
+        organization=lower,
+        description="Passed House",
+        date="2017-02-01",
+        classification=["passage"],
+        order=2,
+    )
+    bill.actions.create(
+        organization=upper,
+        description="Passed Senate",
+        date="2017-03-01",
+        classification=["passage"],
+        order=3,
+    )
+
+    status = BillStatus.objects.get(bill=bill)
+    assert status.first_action_date == status.introduced_date == "2017-01-10"
+    assert status.passed_lower_date == "2017-02-01"
+    assert status.passed_upper_date == "2017-03-01"
+    assert status.latest_action_description == "Passed Senate"
+    assert status.signed_date == ""
+
+    passage.delete()
+    bill.actions.filter(order=3).delete()
+    status.refresh_from_db()
+    assert status.passed_lower_date == status.passed_upper_date == ""
+    assert status.latest_action_date == "2017-01-10"
+
+    bill.actions.all().delete()
+    assert not BillStatus.objects.filter(bill=bill).exists()
+
+
+@pytest.mark.django_db
+def test_parsed_dates(bill, vote_event):
+    assert vote_event.start_precision == "day"
+    assert VoteEvent.objects.between("2017-02-01", date(2017, 3, 1)).get() == vote_event
+    assert not VoteEvent.objects.between(start="2017-02-17").exists()
+
+    a = bill.actions.create(
+        organization=vote_event.organization,
+        description="Signed",
+        date="2017-03-23 16:00-04:00",
+        order=1,
+    )
+    a.date = "2017-03-24"
+    a.save(update_fields=["date"])
+    a.refresh_from_db()
+    assert a.date_precision == "day"
+    assert bill.actions.between(end="2017-03-24").count() == 0
+
+
+@pytest.mark.django_db
+def test_array_helpers(bill, vote_event):
+    bill.subject = ["health", "insurance"]
+    bill.classification = ["bill"]
+    bill.save()
+    bill.actions.create(
+        organization=vote_event.organization,
+        description="Signed",
+        date="2017-03-23",
+        classification=["executive-signature", "became-law"],
+        order=1,
+    )
+
+    assert Bill.objects.with_subject("health").get() == bill
+    assert Bill.objects.with_subject(["health", "taxes"]).exists()
+    assert not Bill.objects.with_subject(["health", "taxes"], match_all=True).exists()
+    assert Bill.objects.with_classification("bill").exists()
+    assert Bill.objects.with_action_classification("became-law").get() == bill
+    assert not Bill.objects.with_action_classification("executive-veto").exists()
+    assert bill.actions.with_classification("became-law").count() == 1
+
+    vote_event.motion_classification = ["bill-passage"]
+    vote_event.save()
+    assert VoteEvent.objects.with_motion_classification("bill-passage").exists()
+
+
+@pytest.mark.django_db
+def test_bill_facets(bill, legislative_session):
+    bill.subject = ["health", "insurance"]
+    bill.save()
+    Bill.objects.create(
+        legislative_session=legislative_session,
+        identifier="HR 1",
+        title="Tax Cuts",
+        classification=["bill"],
+        subject=["taxes", "health"],
+    )
+
+    facets = Bill.objects.facets(["subject", "classification", "session"])
+    assert facets["subject"] == [("health", 2), ("insurance", 1), ("taxes", 1)]
+    assert facets["classification"] == [("bill", 1)]
+    assert facets["session"] == [("2017", 2)]
+
+    assert Bill.objects.with_subject("taxes").facets(["subject"]) == {
+        "subject": [("health", 1), ("taxes", 1)]
+    }
+    with pytest.raises(ValueError):
+        Bill.objects.facets(["color"])
+
+
+@pytest.mark.django_db
+def test_bill_facets_sponsor_party(bill):
+    democrats = Organization.objects.create(name="Democratic", classification="party")
+    republicans = Organization.objects.create(name="Republican", classification="party")
+    pelosi = Person.objects.create(name="Nancy Pelosi")
+    boehner = Person.objects.create(name="John Boehner")
+    pelosi.memberships.create(organization=democrats)
+    sponsorship = bill.sponsorships.create(
+        name="Pelosi", entity_type="person", person=pelosi, primary=True
+    )
+    assert Bill.objects.facets(["sponsor_party"]) == {"sponsor_party": [("Democratic", 1)]}
+
+    # neither change touches the bill, both must invalidate the cached counts
+    membership = boehner.memberships.create(organization=republicans)
+    sponsorship.person = boehner
+    sponsorship.save()
+    assert Bill.objects.facets(["sponsor_party"]) == {"sponsor_party": [("Republican", 1)]}
+    membership.delete()
+    assert Bill.objects.facets(["sponsor_party"]) == {"sponsor_party": []}
+
+    # bulk changes are picked up once invalidated
+    boehner.memberships.create(organization=republicans)
+    assert Bill.objects.facets(["sponsor_party"]) == {"sponsor_party": [("Republican", 1)]}
+    bill.sponsorships.filter(id=sponsorship.id).update(person=pelosi)
+    assert Bill.objects.facets(["sponsor_party"]) == {"sponsor_party": [("Republican", 1)]}
+    invalidate_bill_facets()
+    assert Bill.objects.facets(["sponsor_party"]) == {"sponsor_party": [("Democratic", 1)]}
+
+    # only parties held during the bill's 2017 session count
+    pelosi.memberships.update(end_date="2016")
+    pelosi.memberships.create(organization=republicans, start_date="2018")
+    assert Bill.objects.facets(["sponsor_party"]) == {"sponsor_party": []}
+    pelosi.memberships.filter(organization=democrats).update(end_date="2017-02")
+    invalidate_bill_facets()
+    assert Bill.objects.facets(["sponsor_party"]) == {"sponsor_party": [("Democratic", 1)]}
+
+
+@pytest.mark.django_db
+def test_bill_facets_cache_key(bill, django_assert_num_queries):
+    Bill.objects.facets(["sponsor_party"])
+    # a cached result takes no queries at all
+    with django_assert_num_queries(0):
+        Bill.objects.facets(["sponsor_party"])
+
+
+@pytest.mark.django_db
+def test_bill_search(bill, legislative_session):
+    other = Bill.objects.create(
+        legislative_session=legislative_session, identifier="HB 2", title="Insurance"
+    )
+    SearchableBill.objects.create(bill=bill, raw_text="health insurance reform")
+    SearchableBill.objects.create(bill=other, raw_text="insurance of boats")
+
+    results = list(Bill.objects.search("health insurance", headline=True))
+    assert results == [bill]
+    assert "<b>health</b>" in results[0].headline
+
+    first, second = Bill.objects.search("insurance", session=legislative_session)
+    assert first.rank >= second.rank
+    assert list(Bill.objects.search("insurance", after=(first.rank, first.id))) == [second]
+    assert not list(Bill.objects.search("insurance", jurisdiction="ocd-jurisdiction/none"))
+
+
+@pytest.mark.django_db
+def test_bill_search_vector_trigger(bill):
+    searchable = SearchableBill.objects.create(bill=bill, raw_text="health reform")
+    searchable.refresh_from_db()
+    # identifier & title are weighted A, raw text D
+    assert re.search(r"'patient':\d+A", searchable.search_vector)
+    assert re.search(r"'health':\d+( |$)", searchable.search_vector)
+
+    assert not list(Bill.objects.search("obamacare"))
+    bill.other_titles.create(title="Obamacare")
+    assert list(Bill.objects.search("obamacare")) == [bill]
+    bill.abstracts.create(abstract="Expands medicaid")
+    assert list(Bill.objects.search("medicaid")) == [bill]
+    bill.other_titles.all().delete()
+    assert not list(Bill.objects.search("obamacare"))
+
+
 @pytest.mark.django_db
 def test_bill_version_with_links(bill):
     v = bill.versions.create(note="Engrossed", date="2017-03-15")
@@ -457,3 +907,86 @@ def test_event_agenda(event, vote_event, bill):
         r_e.entity_type = ""
         assert r_e.name in r_e.entity_name
         assert r_e.entity_id is None
+
+
+@pytest.mark.django_db
+def test_event_in_window(event, django_assert_num_queries):
+    jurisdiction = event.jurisdiction
+    early = Event.objects.create(
+        name="Early",
+        jurisdiction=jurisdiction,
+        description="",
+        classification="committee-meeting",
+        start_date="2017-02-28T23:30:00-05:00",
+        status="passed",
+        location=event.location,
+    )
+    late = Event.objects.create(
+        name="Late",
+        jurisdiction=jurisdiction,
+        description="",
+        classification="committee-meeting",
+        start_date="2017-03-31T23:30:00",
+        status="passed",
+    )
+
+    # early starts on March 1st in UTC, but not in New York
+    assert list(Event.objects.in_window(jurisdiction, date(2017, 3, 1), date(2017, 3, 31))) == [
+        early,
+        late,
+    ]
+    assert list(
+        Event.objects.in_window(
+            jurisdiction, date(2017, 3, 1), date(2017, 3, 31), tz="America/New_York"
+        )
+    ) == [late]
+    assert not Event.objects.in_window(jurisdiction.id, "2017-04-01", "2017-05-01").exists()
+
+    # date strings are local dates too, and the end date is inclusive
+    assert list(
+        Event.objects.in_window(jurisdiction, "2017-03-01", "2017-03-31", tz="America/New_York")
+    ) == [late]
+    assert list(
+        Event.objects.in_window(
+            jurisdiction, "2017-03-31T19:00", "2017-03-31T20:00", tz="America/New_York"
+        )
+    ) == [late]
+
+    # events already under way at the start of the window are included
+    session = Event.objects.create(
+        name="Session",
+        jurisdiction=jurisdiction,
+        description="",
+        classification="other",
+        start_date="2017-01-09",
+        end_date="2017-03-15",
+        status="passed",
+    )
+    assert list(Event.objects.in_window(jurisdiction, "2017-03-10", "2017-03-31")) == [
+        session,
+        late,
+    ]
+    assert list(Event.objects.in_window(jurisdiction, "2017-03-16", "2017-03-31")) == [late]
+    session.delete()
+
+    for e in (early, late):
+        e.participants.create(name="Committee on Energy", entity_type="organization", note="")
+        agenda = e.agenda.create(description="Wind farms")
+        agenda.related_entities.create(name="SB 1", entity_type="bill", note="")
+        agenda.media.create(note="Testimony").links.create(url="http://example.com/a.mp3")
+        e.media.create(note="Recording").links.create(url="http://example.com/e.mp4")
+        e.documents.create(note="Agenda").links.create(url="http://example.com/e.pdf")
+        e.links.create(url="http://example.com/")
+        e.sources.create(url="http://example.com/source")
+
+    events = Event.objects.in_window(jurisdiction, "2017-03-01", "2017-04-01").with_details()
+    with django_assert_num_queries(12):
+        for e in events:
+            str(e.location)
+            for relation in (e.participants, e.agenda, e.media, e.documents, e.links, e.sources):
+                assert len(relation.all()) == 1
+            for item in e.agenda.all():
+                assert len(item.related_entities.all()) == 1
+                assert len(item.media.all()[0].links.all()) == 1
+            assert len(e.media.all()[0].links.all()) == 1
+            assert len(e.documents.all()[0].links.all()) == 1
@@ -0,0 +1,57 @@
+from opencivicdata.names import normalize_name, normalize_organization_name, NameIndex
+
+
+def test_normalize_name():
+    assert normalize_name("John Smith") == "john smith"
+    assert normalize_name("Smith, John") == "john smith"
+    assert normalize_name("SMITH, JOHN A.") == "john a smith"
+    assert normalize_name("Sen. John Smith, Jr.") == "john smith"
+    assert normalize_name("Rep. Smith") == "smith"
+    assert normalize_name("José Núñez") == "jose nunez"
+    assert normalize_name("Chappelle-Nadal, Maria") == "maria chappelle nadal"
+    assert normalize_name("") == ""
+    assert normalize_name(None) == ""
+
+
+def test_normalize_organization_name():
+    assert normalize_organization_name("The Committee on Energy") == "committee on energy"
+    assert normalize_organization_name("Speaker's Office") == "speaker s office"
+    assert normalize_organization_name("Ways & Means, Committee") == "ways means committee"
+
+
+def test_name_index_tiers():
+    index = NameIndex()
+    index.add_person("p1", "John Smith", "Smith, John", "John", "Smith")
+    index.add_person("p2", "Jane Smith", "Smith, Jane", "Jane", "Smith", ["Jane Doe"])
+    index.add_person("p3", "Tom Jones", given_name="Tom", family_name="Jones")
+
+    assert index.match("Sen. John Smith").id == "p1"
+    assert index.match("Doe, Jane").id == "p2"
+    assert index.match("Jones").id == "p3"
+    assert index.match("T. Jones").id == "p3"
+
+    # two Smiths share a family name and an initial
+    smith = index.match("Smith")
+    assert smith.ambiguous
+    assert smith.id is None
+    assert smith.ids == ("p1", "p2")
+    assert index.match("J. Smith").ambiguous
+
+    unknown = index.match("Nobody")
+    assert unknown.ids == ()
+    assert not unknown.ambiguous
+
+
+def test_name_index_full_name_beats_family_name():
+    index = NameIndex()
+    index.add_person("p1", "Smith")
+    index.add_person("p2", "Jane Smith", given_name="Jane", family_name="Smith")
+    assert index.match("Smith").id == "p1"
+
+
+def test_name_index_custom_normalizer():
+    index = NameIndex(normalizer=lambda name: name.strip())
+    index.add("p1", "John Smith")
+    assert index.match(" John Smith ").id == "p1"
+    assert index.match("john smith").id is None
+    assert index.match_all(["John Smith", "x"])["John Smith"].id == "p1"
@@ -0,0 +1,47 @@
+import pytest
+from opencivicdata.core.models import Organization, Person
+from opencivicdata.core.resolvers import PersonNameResolver
+
+
+@pytest.fixture
+def senate(jurisdiction):
+    senate = Organization.objects.create(name="Senate", jurisdiction=jurisdiction)
+    john = Person.objects.create(
+        name="John Smith", sort_name="Smith, John", given_name="John", family_name="Smith"
+    )
+    jane = Person.objects.create(
+        name="Jane Smith", sort_name="Smith, Jane", given_name="Jane", family_name="Smith"
+    )
+    jane.add_other_name("Jane Doe")
+    senate.memberships.create(person=john, start_date="2015", end_date="2016")
+    senate.memberships.create(person=jane, start_date="2017")
+    return senate
+
+
+@pytest.mark.django_db
+def test_resolve_scoped_by_date(senate, django_assert_num_queries):
+    john = Person.objects.get(name="John Smith")
+    jane = Person.objects.get(name="Jane Smith")
+    resolver = PersonNameResolver()
+
+    # only one Smith sat in the senate in each of these years
+    assert resolver.resolve_name("Smith", organization=senate, date="2015-06-01").id == john.id
+    assert resolver.resolve_name("Smith", organization=senate, date="2018-06-01").id == jane.id
+
+    # without a date both are in scope
+    matches = resolver.resolve(["Smith", "Doe, Jane", "Nobody"], organization=senate)
+    assert matches["Smith"].ambiguous
+    assert matches["Doe, Jane"].id == jane.id
+    assert matches["Nobody"].ids == ()
+
+    # indexes are built once per scope
+    with django_assert_num_queries(0):
+        resolver.resolve(["Sen. Smith"], organization=senate)
+
+
+@pytest.mark.django_db
+def test_resolve_scoped_by_jurisdiction(senate, jurisdiction):
+    outsider = Person.objects.create(name="Tom Jones")
+    resolver = PersonNameResolver()
+    assert resolver.resolve_name("Tom Jones", jurisdiction=jurisdiction).id is None
+    assert resolver.resolve_name("Tom Jones").id == outsider.id
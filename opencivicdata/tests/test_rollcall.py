@@ -0,0 +1,49 @@
+import pytest
+from opencivicdata.legislative.rollcall import NO_VOTE, VoteMatrix
+
+np = pytest.importorskip("numpy")
+
+
+def test_from_votes():
+    matrix = VoteMatrix.from_votes(
+        [
+            ("v1", "p2", "yes"),
+            ("v1", "p1", "no"),
+            ("v2", "p2", "maybe"),
+            ("v3", "p1", "yes"),
+        ],
+        vote_event_ids=["v2", "v1"],
+    )
+    assert matrix.person_ids == ["p1", "p2"]
+    assert matrix.vote_event_ids == ["v2", "v1"]
+    assert matrix.matrix.dtype == np.int8
+    assert matrix.matrix.tolist() == [
+        [NO_VOTE, VoteMatrix.code("no")],
+        [VoteMatrix.code("other"), VoteMatrix.code("yes")],
+    ]
+    assert VoteMatrix.option(matrix.matrix[matrix.person_index("p2"), 1]) == "yes"
+
+
+def test_from_votes_empty():
+    matrix = VoteMatrix.from_votes([])
+    assert matrix.matrix.shape == (0, 0)
+
+
+def test_save_and_load(tmp_path):
+    matrix = VoteMatrix.from_votes([("v1", "p1", "yes"), ("v2", "p1", "absent")])
+    matrix.save(str(tmp_path / "votes.npz"))
+    loaded = VoteMatrix.load(str(tmp_path / "votes.npz"))
+    assert loaded.person_ids == ["p1"]
+    assert loaded.vote_event_ids == ["v1", "v2"]
+    assert (loaded.matrix == matrix.matrix).all()
+
+
+@pytest.mark.django_db
+def test_for_session(vote_event, person):
+    vote_event.votes.create(voter=person, voter_name=person.name, option="yes")
+    vote_event.votes.create(voter_name="Unresolved", option="no")
+
+    matrix = VoteMatrix.for_session(vote_event.legislative_session)
+    assert matrix.person_ids == [person.id]
+    assert matrix.vote_event_ids == [vote_event.id]
+    assert matrix.matrix.tolist() == [[VoteMatrix.code("yes")]]
@@ -0,0 +1,38 @@
+import pytest
+from django.core.management import call_command
+from opencivicdata.legislative.votecounts import (
+    derive_vote_counts,
+    vote_count_mismatches,
+    vote_count_summary,
+)
+
+
+@pytest.mark.django_db
+def test_vote_counts(vote_event):
+    vote_event.votes.create(voter_name="Ann", option="yes")
+    vote_event.votes.create(voter_name="Bob", option="no")
+    session = vote_event.legislative_session
+    assert vote_count_summary(session=session) == [(session.id, 0, 0, 1)]
+
+    assert derive_vote_counts(session=session) == 2
+    assert derive_vote_counts(session=session) == 0
+    assert vote_count_summary(session=session) == [(session.id, 1, 0, 0)]
+
+    vote_event.counts.filter(option="yes").update(value=3)
+    assert vote_count_summary(session=session) == [(session.id, 1, 1, 0)]
+    assert vote_count_mismatches(session=session) == [
+        (vote_event.id, "no", 1, 1),
+        (vote_event.id, "yes", 3, 1),
+    ]
+    assert vote_count_mismatches(session=session, after=vote_event.id) == []
+
+
+@pytest.mark.django_db
+def test_checkvotecounts_command(vote_event, capsys):
+    vote_event.votes.create(voter_name="Ann", option="yes")
+    vote_event.counts.create(option="yes", value=2)
+
+    call_command("checkvotecounts", details=True)
+    out = capsys.readouterr().out
+    assert "1 compared, 1 mismatched, 0 without counts" in out
+    assert "{} yes: 2 counted, 1 votes".format(vote_event.id) in out
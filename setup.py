@@ -6,7 +6,9 @@ install_requires = [
 ]
 
 extras_require = {
-    "dev": ["pytest>=3.6", "pytest-cov", "pytest-django", "coveralls", "flake8"]
+    "dev": ["pytest>=3.6", "pytest-cov", "pytest-django", "coveralls", "flake8"],
+    "pdf": ["pdfminer.six"],
+    "analytics": ["numpy", "scipy"],
 }
 
 setup(